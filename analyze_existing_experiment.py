@@ -9,12 +9,74 @@ dataset information without running new data collection.
 import os
 import uuid
 from datetime import datetime
+from itertools import islice
+from pathlib import Path
 from astra_admin import AstraAdmin
+from gpc_utils import dedupe_dataset_names, get_file_size, list_dataset_names, load_cached_definitions, log, save_cached_definitions
 
-def log(message: str):
-    """Log with timestamp"""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    print(f"[{timestamp}] {message}")
+RESULTS_DIR = Path(r"C:\Users\Administrator.WS\Desktop\wyatt-api\gpc-automation\results")
+# Key for this script's entries in the shared dataset cache
+CACHE_SCRIPT = Path(__file__).stem
+
+# Comprehensive list of possible dataset definitions (fallback only)
+CANDIDATE_DEFINITIONS = dedupe_dataset_names([
+    # Wyatt's official examples
+    "mean square radius vs volume",
+    
+    # Molecular weight variations
+    "molecular weight vs volume", 
+    "molar mass vs volume",
+    "Molecular Weight vs Volume",
+    "Molar Mass vs Volume",
+    "molecular weight vs. volume",
+    "molar mass vs. volume",
+    "molecular_weight_vs_volume",
+    "molar_mass_vs_volume",
+    
+    # Other common data types
+    "concentration vs volume",
+    "Concentration vs Volume",
+    "concentration vs. volume",
+    "intensity vs volume",
+    "Intensity vs Volume", 
+    "light scattering vs volume",
+    "refractive index vs volume",
+    "differential refractive index vs volume",
+    "viscometry vs volume",
+    "UV vs volume",
+    "viscometer vs volume",
+    
+    # Alternative formats
+    "Mn vs Volume",
+    "Mw vs Volume", 
+    "mn vs volume",
+    "mw vs volume",
+    "polydispersity vs volume",
+    "radius vs volume",
+    "rms radius vs volume",
+    
+    # Try single words
+    "molecular",
+    "weight",
+    "molar", 
+    "mass",
+    "concentration",
+    "intensity",
+    "radius",
+    
+    # Try empty (might give default dataset)
+    "",
+])
+
+def read_export_preview(path, count=10):
+    """
+    Read the first `count` lines of an exported CSV and count the rest,
+    streaming through the file instead of loading it.
+    """
+    with open(path, 'r', errors='replace') as f:
+        preview_lines = [line.rstrip('\n') for line in islice(f, count)]
+        line_count = len(preview_lines) + sum(1 for _ in f)
+    return preview_lines, line_count
 
 def main():
     """
@@ -22,16 +84,13 @@ def main():
     """
     log("🔍 Analyzing Existing Experiment for Dataset Export")
     
-    # Setup
-    results_dir = r"C:\Users\Administrator.WS\Desktop\wyatt-api\gpc-automation\results"
-    
     # Find existing experiment files
     experiment_files = []
-    if os.path.exists(results_dir):
-        for file in os.listdir(results_dir):
-            if file.endswith('.afe8'):
-                full_path = os.path.join(results_dir, file)
-                experiment_files.append((file, full_path, os.path.getmtime(full_path)))
+    if RESULTS_DIR.is_dir():
+        with os.scandir(RESULTS_DIR) as entries:
+            for entry in entries:
+                if entry.name.endswith('.afe8'):
+                    experiment_files.append((entry.name, entry.path, entry.stat().st_mtime))
     
     if not experiment_files:
         log("❌ No experiment files (.afe8) found in results directory")
@@ -53,11 +112,12 @@ def main():
     log(f"📍 Full path: {target_file}")
     
     # Step 1: Set automation identity (required for API access)
-    log("=== Step 1: Setting Automation Identity ===")
+    log("=== Step 1: Setting Automation Identity ===", flush=True)
     client_id = uuid.uuid4().hex
     
     try:
-        AstraAdmin().set_automation_identity(
+        admin = AstraAdmin()
+        admin.set_automation_identity(
             "Dataset Debug App", 
             "1.0.0.0",
             os.getpid(),
@@ -70,9 +130,9 @@ def main():
         return False
     
     # Step 2: Wait for instruments (required by API)
-    log("=== Step 2: Waiting for Instruments ===")
+    log("=== Step 2: Waiting for Instruments ===", flush=True)
     try:
-        AstraAdmin().wait_for_instruments()
+        admin.wait_for_instruments()
         log("✓ Instruments detected")
     except Exception as e:
         log(f"✗ Error waiting for instruments: {e}")
@@ -81,15 +141,15 @@ def main():
     # Step 3: Open the existing experiment
     log("=== Step 3: Opening Existing Experiment ===")
     log(f"Opening: {target_file}")
-    log("About to call AstraAdmin().open_experiment()...")
+    log("About to call admin.open_experiment()...", flush=True)
     
     try:
-        experiment_id = AstraAdmin().open_experiment(target_file)
+        experiment_id = admin.open_experiment(target_file)
         log(f"✓ Experiment opened successfully - ID: {experiment_id}")
         
         # Get experiment name
         try:
-            exp_name = AstraAdmin().get_experiment_name(experiment_id)
+            exp_name = admin.get_experiment_name(experiment_id)
             log(f"✓ Experiment name: {exp_name}")
         except Exception as e:
             log(f"⚠ Could not get experiment name: {e}")
@@ -102,74 +162,47 @@ def main():
     
     # Step 4: Analyze available datasets
     log("=== Step 4: Analyzing Available Datasets ===")
-    log("Testing various dataset definitions to see what data exists...")
+    log("Testing various dataset definitions to see what data exists...", flush=True)
     
-    # Comprehensive list of possible dataset definitions
-    dataset_definitions = [
-        # Wyatt's official examples
-        "mean square radius vs volume",
-        
-        # Molecular weight variations
-        "molecular weight vs volume", 
-        "molar mass vs volume",
-        "Molecular Weight vs Volume",
-        "Molar Mass vs Volume",
-        "molecular weight vs. volume",
-        "molar mass vs. volume",
-        "molecular_weight_vs_volume",
-        "molar_mass_vs_volume",
-        
-        # Other common data types
-        "concentration vs volume",
-        "Concentration vs Volume",
-        "concentration vs. volume",
-        "intensity vs volume",
-        "Intensity vs Volume", 
-        "light scattering vs volume",
-        "refractive index vs volume",
-        "differential refractive index vs volume",
-        "viscometry vs volume",
-        "UV vs volume",
-        "viscometer vs volume",
-        
-        # Alternative formats
-        "Mn vs Volume",
-        "Mw vs Volume", 
-        "mn vs volume",
-        "mw vs volume",
-        "polydispersity vs volume",
-        "radius vs volume",
-        "rms radius vs volume",
-        
-        # Try single words
-        "molecular",
-        "weight",
-        "molar", 
-        "mass",
-        "concentration",
-        "intensity",
-        "radius",
-        
-        # Try empty (might give default dataset)
-        "",
-    ]
+    # Reuse the definitions from a previous run if the experiment file hasn't changed
+    cached_definitions = load_cached_definitions(RESULTS_DIR, target_file, CACHE_SCRIPT)
+    if cached_definitions is not None:
+        log(f"✓ Re-checking {len(cached_definitions)} definitions cached from a previous run")
+        dataset_definitions = cached_definitions
+    else:
+        # Ask ASTRA for the real dataset names instead of guessing
+        try:
+            dataset_definitions = list_dataset_names(admin, experiment_id)
+            log(f"✓ GetDataSetNames reported {len(dataset_definitions)} dataset definitions")
+        except Exception as e:
+            log(f"⚠ GetDataSetNames unavailable ({e}) - testing guessed definitions instead")
+            dataset_definitions = CANDIDATE_DEFINITIONS
     
     available_datasets = []
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    # Same for every export, so build the file name suffix once
+    csv_suffix = f"_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
     
+    # Bound once outside the loops; still goes through the wrapper's try_get/rlock
+    save_data_set = admin.save_data_set
+    
+    # Single pass: export each definition straight to CSV and read the preview
+    # back from the file, so ASTRA only sends each dataset once
     for i, dataset_definition in enumerate(dataset_definitions):
+        test_filename = f"dataset_{i:02d}{csv_suffix}"
+        test_path = RESULTS_DIR / test_filename
+        
         try:
-            log(f"  → Testing: '{dataset_definition}'")
-            dataset_content = AstraAdmin().get_data_set(experiment_id, dataset_definition)
+            log(f"  → Testing: '{dataset_definition}'", flush=True)
+            save_success = save_data_set(experiment_id, dataset_definition, str(test_path))
             
-            if dataset_content and len(dataset_content.strip()) > 10:
-                content_length = len(dataset_content)
-                log(f"  ✓ FOUND DATA: '{dataset_definition}' - {content_length} characters")
-                
-                available_datasets.append((dataset_definition, dataset_content))
+            file_size = get_file_size(test_path) if save_success else None
+            preview_lines, line_count = read_export_preview(test_path) if file_size else ([], 0)
+            
+            if file_size and file_size > 10 and any(line.strip() for line in preview_lines):
+                log(f"  ✓ FOUND DATA: '{dataset_definition}' - {file_size:,} bytes exported to {test_filename}")
+                available_datasets.append((i, dataset_definition, file_size, line_count, preview_lines[0]))
                 
                 # Show preview of the data
-                preview_lines = dataset_content.split('\n')[:10]
                 log("    Preview:")
                 for j, line in enumerate(preview_lines):
                     if line.strip():
@@ -177,46 +210,39 @@ def main():
                         if j >= 4:  # Just show first few lines
                             break
                 
-                # Try to export this dataset to CSV
-                test_filename = f"dataset_{i:02d}_{timestamp}.csv"
-                test_path = os.path.join(results_dir, test_filename)
-                
-                try:
-                    log(f"    → Attempting CSV export to: {test_filename}")
-                    save_success = AstraAdmin().save_data_set(experiment_id, dataset_definition, test_path)
-                    
-                    if save_success and os.path.exists(test_path):
-                        file_size = os.path.getsize(test_path)
-                        log(f"    ✓ CSV export SUCCESS: {file_size:,} bytes saved")
-                    else:
-                        log(f"    ✗ CSV export failed (save_data_set returned {save_success})")
-                        
-                except Exception as export_error:
-                    log(f"    ✗ CSV export error: {export_error}")
-                
                 log("")  # Spacing for readability
                 
             else:
-                if dataset_content:
-                    log(f"  → '{dataset_definition}' - data too short ({len(dataset_content)} chars)")
+                if file_size is None:
+                    log(f"  → '{dataset_definition}' - no data (save_data_set returned {save_success})")
                 else:
-                    log(f"  → '{dataset_definition}' - no data")
+                    log(f"  → '{dataset_definition}' - data too short ({file_size} bytes)")
+                    # Don't leave empty exports lying around in the results folder
+                    test_path.unlink()
                     
         except Exception as e:
             log(f"  → '{dataset_definition}' - error: {e}")
     
+    # Only a full discovery run is cached. If a cached definition stopped
+    # working, the entry is dropped so the next run discovers everything again
+    working_definitions = [definition for _, definition, *_ in available_datasets]
+    try:
+        if cached_definitions is None:
+            save_cached_definitions(RESULTS_DIR, target_file, CACHE_SCRIPT, working_definitions)
+        elif len(working_definitions) < len(cached_definitions):
+            save_cached_definitions(RESULTS_DIR, target_file, CACHE_SCRIPT, [])
+    except OSError as e:
+        log(f"⚠ Could not update dataset cache: {e}")
+    
     # Step 5: Summary of findings
     log("=== Step 5: Dataset Analysis Summary ===")
     
     if available_datasets:
         log(f"🎉 SUCCESS: Found {len(available_datasets)} working dataset definitions:")
-        for definition, content in available_datasets:
-            lines = len(content.split('\n'))
-            chars = len(content)
-            log(f"  ✓ '{definition}' - {lines} lines, {chars} characters")
+        for _, definition, size, lines, header_line in available_datasets:
+            log(f"  ✓ '{definition}' - {lines} lines, {size:,} bytes")
             
             # Try to identify what type of data this is
-            header_line = content.split('\n')[0] if content.split('\n') else ""
             if header_line:
                 log(f"    Headers: {header_line[:100]}...")
         
@@ -225,7 +251,7 @@ def main():
         log("  → Your experiment DOES contain exportable data")
         log("  → The CSV export should work with the correct dataset definitions")
         log("  → Check the exported CSV files in the results folder")
-        log(f"  → Files named: dataset_XX_{timestamp}.csv")
+        log(f"  → Files named: dataset_XX{csv_suffix}")
         
     else:
         log("❌ No working dataset definitions found")
@@ -235,15 +261,15 @@ def main():
         log("  → The experiment needs to be processed/analyzed first")
     
     # Step 6: Close experiment cleanly
-    log("=== Step 6: Cleanup ===")
+    log("=== Step 6: Cleanup ===", flush=True)
     try:
-        AstraAdmin().close_experiment(experiment_id)
+        admin.close_experiment(experiment_id)
         log("✓ Experiment closed")
     except Exception as e:
         log(f"⚠ Warning - close error: {e}")
     
     try:
-        AstraAdmin().dispose()
+        admin.dispose()
         log("✓ ASTRA connection disposed")
     except Exception as e:
         log(f"⚠ Warning - dispose error: {e}")
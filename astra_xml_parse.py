@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+ASTRA Results XML Parsing
+
+Shared by the standalone extractor scripts: pulls the per-peak molar
+mass, polydispersity and rms radius results out of an ASTRA results
+XML export and formats them the way the ASTRA GUI shows them.
+"""
+
+from collections import defaultdict
+
+# lxml parses faster; the standard library parser is used if it isn't installed
+try:
+    from lxml import etree
+    HAVE_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as etree
+    HAVE_LXML = False
+
+# <result> types to extract: (name to keep, or None for every molar mass
+# moment, whether the scalar carries units)
+RESULT_TYPES = {
+    'molar mass': (None, True),
+    'polydispersity': ('Mw/Mn', False),
+    'rms radius': ('rz', True),
+}
+
+# First characters of a numeric <scalar> value
+NUMBER_START = '+-.0123456789'
+
+# Results a peak has once everything extract_peak_results() looks for is found
+COMPLETE_PEAK_RESULTS = frozenset({'Mn', 'Mw', 'Mp', 'Mz', 'Mw/Mn', 'rz'})
+
+def extract_peak_results(source, expected_peaks=None):
+    """
+    Extract peak molecular weight results from ASTRA XML
+
+    `source` is the path (or a binary file object) of the exported results.
+    Returns {peak number: {result name: (value, units, uncertainty %)}}.
+
+    If the caller knows how many peaks the experiment has, pass it as
+    `expected_peaks`: parsing stops as soon as that many peaks have every
+    result in COMPLETE_PEAK_RESULTS, skipping the rest of the file.
+
+    The file is streamed with iterparse and each <result> element is read
+    from its parsed children, so attribute order and line layout don't matter.
+    Placeholder and malformed values are skipped; a malformed file raises,
+    so callers can report what went wrong.
+    """
+    peak_data = defaultdict(dict)
+
+    if HAVE_LXML:
+        # lxml matches the tag in C, so only <result> elements (in any
+        # namespace) come back from the parser
+        context = etree.iterparse(source, events=('end',), tag='{*}result')
+    else:
+        # The first 'start' event is the document root, kept so it can be cleared
+        context = etree.iterparse(source, events=('start', 'end'))
+        _, root = next(context)
+
+    for event, elem in context:
+        # Tags carry the ASTRA namespace; a suffix check avoids building a
+        # partition tuple for every element
+        if not HAVE_LXML and (event != 'end' or not (elem.tag == 'result' or elem.tag.endswith('}result'))):
+            continue
+
+        spec = RESULT_TYPES.get(elem.get('type'))
+        if spec is not None:
+            wanted_name, has_units = spec
+
+            name = scalar = None
+            for child in elem:
+                child_tag = child.tag.rpartition('}')[2]
+                if child_tag == 'name' and name is None:
+                    name = child.text
+                elif child_tag == 'scalar' and scalar is None:
+                    scalar = child
+
+            if name and (wanted_name is None or name == wanted_name) and scalar is not None:
+                units = scalar.get('units') if has_units else ''
+                uncertainty = scalar.get('uncertainty')
+                peak = scalar.get('peak')
+                value_str = (scalar.text or '').strip()
+
+                # Placeholders such as "n/a" and "~Invalid" don't start like a number;
+                # a value, uncertainty or peak number that still doesn't convert
+                # only skips this result
+                if (units is not None and uncertainty is not None and peak is not None
+                        and value_str and value_str[0] in NUMBER_START):
+                    try:
+                        peak_num = int(peak)
+                        value = float(value_str)
+                        uncertainty_value = float(uncertainty)
+                    except ValueError:
+                        pass
+                    else:
+                        # A zero value has no relative uncertainty; report 0%
+                        pct_uncertainty = (uncertainty_value / value) * 100 if value else 0.0
+
+                        peak_data[peak_num][name] = (value, units, pct_uncertainty)
+
+                        if (expected_peaks is not None and len(peak_data) == expected_peaks
+                                and all(COMPLETE_PEAK_RESULTS <= results.keys() for results in peak_data.values())):
+                            break
+
+        # Free the finished element and everything parsed before it, so
+        # memory stays bounded by one <result> rather than the whole file
+        elem.clear()
+        if HAVE_LXML:
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+        else:
+            # ElementTree has no parent links; dropping the root's children
+            # releases the finished subtrees instead
+            root.clear()
+
+    return dict(peak_data)
+
+# Bound str.format methods per uncertainty precision, indexed by
+# value >= 1000 (scientific notation from 1000 up); built on first use
+_VALUE_FORMATS = {}
+
+def format_value_with_uncertainty(value, units, uncertainty_pct, uncertainty_places=1):
+    """Format value with uncertainty like ASTRA GUI"""
+    formats = _VALUE_FORMATS.get(uncertainty_places)
+    if formats is None:
+        formats = _VALUE_FORMATS[uncertainty_places] = (
+            f"{{:.1f}} (±{{:.{uncertainty_places}f}}%)".format,
+            f"{{:.3e}} (±{{:.{uncertainty_places}f}}%)".format,
+        )
+    return formats[value >= 1000](value, uncertainty_pct)
@@ -9,12 +9,109 @@ that actually contain data, handling the _empty object issue properly.
 import os
 import uuid
 from datetime import datetime
+from pathlib import Path
 from astra_admin import AstraAdmin
+from gpc_utils import dedupe_dataset_names, filename_table, first_lines, get_file_size, list_dataset_names, load_cached_definitions, log, match_dataset_names, sanitize_filename, save_cached_definitions
 
-def log(message: str):
-    """Log with timestamp"""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    print(f"[{timestamp}] {message}")
+RESULTS_DIR = Path(r"C:\Users\Administrator.WS\Desktop\wyatt-api\gpc-automation\results")
+# Key for this script's entries in the shared dataset cache
+CACHE_SCRIPT = Path(__file__).stem
+
+# Separators become "_", anything else that isn't alphanumeric or "._-" is dropped
+_FILENAME_TABLE = filename_table("._-", to_underscore=" |:")
+
+# Based on what we found, let's try more radius/light scattering variations
+# (only used if ASTRA can't list its dataset names)
+CANDIDATE_DEFINITIONS = dedupe_dataset_names([
+    # Known working one first
+    "rms radius vs volume",
+    
+    # Light scattering variations
+    "light scattering vs volume",
+    "light scattering data vs volume", 
+    "rayleigh ratio vs volume",
+    "detector 1 vs volume",
+    "detector 2 vs volume", 
+    "detector 3 vs volume",
+    "angle 1 vs volume",
+    "angle 2 vs volume",
+    "90 degree vs volume",
+    
+    # Radius variations  
+    "mean square radius vs volume",
+    "radius vs volume",
+    "rg vs volume",
+    "radius of gyration vs volume",
+    
+    # Molecular weight (even though they failed, try variations)
+    "molecular weight vs volume",
+    "molar mass vs volume",
+    "Mn vs volume", 
+    "Mw vs volume",
+    "Mp vs volume",
+    "weight average vs volume",
+    "number average vs volume",
+    "peak molecular weight vs volume",
+    
+    # Concentration variations
+    "concentration vs volume",
+    "conc vs volume", 
+    "c vs volume",
+    "mass concentration vs volume",
+    
+    # Other detector data
+    "refractive index vs volume",
+    "ri vs volume",
+    "dri vs volume", 
+    "differential refractive index vs volume",
+    "uv vs volume",
+    "UV vs volume",
+    "UV detector vs volume",
+    "viscometer vs volume",
+    "viscometry vs volume",
+    "intrinsic viscosity vs volume",
+    
+    # Try volume as x-axis variations
+    "volume vs rms radius",
+    "volume vs molecular weight", 
+    "volume vs concentration",
+    "volume vs light scattering",
+    
+    # Try time-based
+    "rms radius vs time",
+    "molecular weight vs time",
+    "light scattering vs time", 
+    "concentration vs time",
+    
+    # Try elution volume variations
+    "rms radius vs elution volume",
+    "molecular weight vs elution volume",
+    "light scattering vs elution volume",
+    
+    # Try without "vs"
+    "rms radius volume",
+    "molecular weight volume", 
+    "light scattering volume",
+    
+    # Try different separators
+    "rms radius | volume",
+    "molecular weight | volume",
+    "rms radius : volume",
+    "molecular weight : volume",
+    
+    # Try generic terms
+    "data",
+    "results", 
+    "chromatogram",
+    "peak",
+    "baseline",
+    "raw data",
+    "detector data",
+    
+    # Try combinations
+    "molar mass and radius vs volume",
+    "molecular weight and radius vs volume",
+])
 
 def is_valid_dataset_content(content):
     """Check if dataset content is valid (not empty object)"""
@@ -22,9 +119,8 @@ def is_valid_dataset_content(content):
         # Try to access string methods to detect _empty objects
         if content is None:
             return False
-        if hasattr(content, 'strip') and len(content.strip()) > 10:
-            return True
-        return False
+        # isspace() avoids making a stripped copy of the whole dataset
+        return len(content) > 10 and not content.isspace()
     except (AttributeError, TypeError):
         # This catches the '_empty' object has no attribute 'strip' error
         return False
@@ -35,157 +131,73 @@ def main():
     """
     log("🔍 Comprehensive Dataset Definition Search")
     
-    # Setup
-    results_dir = r"C:\Users\Administrator.WS\Desktop\wyatt-api\gpc-automation\results"
-    
     # Find experiment file (use the same one from previous analysis)
-    target_file = os.path.join(results_dir, "collected_experiment_20260113_114325.aex.afe8")
+    target_file = RESULTS_DIR / "collected_experiment_20260113_114325.aex.afe8"
     
-    if not os.path.exists(target_file):
+    if not target_file.is_file():
         log(f"❌ Experiment file not found: {target_file}")
         return False
     
-    log(f"📁 Using experiment: {os.path.basename(target_file)}")
+    log(f"📁 Using experiment: {target_file.name}")
     
     # Setup ASTRA connection
-    log("=== Setting up ASTRA Connection ===")
+    log("=== Setting up ASTRA Connection ===", flush=True)
     client_id = uuid.uuid4().hex
     
     try:
-        AstraAdmin().set_automation_identity("Dataset Search", "1.0.0.0", os.getpid(), client_id, 1)
-        AstraAdmin().wait_for_instruments()
-        experiment_id = AstraAdmin().open_experiment(target_file)
+        admin = AstraAdmin()
+        admin.set_automation_identity("Dataset Search", "1.0.0.0", os.getpid(), client_id, 1)
+        admin.wait_for_instruments()
+        experiment_id = admin.open_experiment(str(target_file))
         log(f"✓ Experiment opened - ID: {experiment_id}")
     except Exception as e:
         log(f"✗ Error setting up ASTRA: {e}")
         return False
     
     # Extended list of dataset definitions to try
-    log("=== Searching for Dataset Definitions ===")
+    log("=== Searching for Dataset Definitions ===", flush=True)
     
-    # Based on what we found, let's try more radius/light scattering variations
-    dataset_definitions = [
-        # Known working one first
-        "rms radius vs volume",
-        
-        # Light scattering variations
-        "light scattering vs volume",
-        "light scattering data vs volume", 
-        "rayleigh ratio vs volume",
-        "detector 1 vs volume",
-        "detector 2 vs volume", 
-        "detector 3 vs volume",
-        "angle 1 vs volume",
-        "angle 2 vs volume",
-        "90 degree vs volume",
-        
-        # Radius variations  
-        "mean square radius vs volume",
-        "radius vs volume",
-        "rg vs volume",
-        "radius of gyration vs volume",
-        
-        # Molecular weight (even though they failed, try variations)
-        "molecular weight vs volume",
-        "molar mass vs volume",
-        "Mn vs volume", 
-        "Mw vs volume",
-        "Mp vs volume",
-        "weight average vs volume",
-        "number average vs volume",
-        "peak molecular weight vs volume",
-        
-        # Concentration variations
-        "concentration vs volume",
-        "conc vs volume", 
-        "c vs volume",
-        "mass concentration vs volume",
-        
-        # Other detector data
-        "refractive index vs volume",
-        "ri vs volume",
-        "dri vs volume", 
-        "differential refractive index vs volume",
-        "uv vs volume",
-        "UV vs volume",
-        "UV detector vs volume",
-        "viscometer vs volume",
-        "viscometry vs volume",
-        "intrinsic viscosity vs volume",
-        
-        # Try volume as x-axis variations
-        "volume vs rms radius",
-        "volume vs molecular weight", 
-        "volume vs concentration",
-        "volume vs light scattering",
-        
-        # Try time-based
-        "rms radius vs time",
-        "molecular weight vs time",
-        "light scattering vs time", 
-        "concentration vs time",
-        
-        # Try elution volume variations
-        "rms radius vs elution volume",
-        "molecular weight vs elution volume",
-        "light scattering vs elution volume",
-        
-        # Try without "vs"
-        "rms radius volume",
-        "molecular weight volume", 
-        "light scattering volume",
-        
-        # Try different separators
-        "rms radius | volume",
-        "molecular weight | volume",
-        "rms radius : volume",
-        "molecular weight : volume",
-        
-        # Try generic terms
-        "data",
-        "results", 
-        "chromatogram",
-        "peak",
-        "baseline",
-        "raw data",
-        "detector data",
+    # Reuse the definitions from a previous run if the experiment file hasn't changed
+    cached_definitions = load_cached_definitions(RESULTS_DIR, target_file, CACHE_SCRIPT)
+    if cached_definitions is not None:
+        log(f"✓ Re-checking {len(cached_definitions)} definitions cached from a previous run")
+        dataset_definitions = cached_definitions
+    else:
+        # Ask ASTRA for the real dataset names instead of guessing
+        try:
+            dataset_names = list_dataset_names(admin, experiment_id)
+            log(f"✓ GetDataSetNames reported {len(dataset_names)} dataset definitions")
         
-        # Try combinations
-        "molar mass and radius vs volume",
-        "molecular weight and radius vs volume",
-    ]
+            # Only probe guesses that resolve to a real name, then anything ASTRA
+            # reports that none of the guesses covered
+            matched = match_dataset_names(CANDIDATE_DEFINITIONS, dataset_names)
+            log(f"  → {len(matched)} guessed definitions match ASTRA names, "
+                f"{len(dataset_names) - len(matched)} names not covered by guesses")
+            dataset_definitions = matched + [name for name in dataset_names if name not in matched]
+        except Exception as e:
+            log(f"⚠ GetDataSetNames unavailable ({e}) - testing guessed definitions instead")
+            dataset_definitions = CANDIDATE_DEFINITIONS
     
     working_datasets = []
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    # Same for every export, so build the file name suffix once
+    csv_suffix = f"_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    
+    log(f"Testing {len(dataset_definitions)} dataset definitions...", flush=True)
     
-    log(f"Testing {len(dataset_definitions)} dataset definitions...")
+    # Bound once outside the loops; still goes through the wrapper's try_get/rlock
+    get_data_set, save_data_set = admin.get_data_set, admin.save_data_set
     
+    # Probe pass: only GetDataSet calls, so the ASTRA round-trips run back-to-back
     for i, definition in enumerate(dataset_definitions):
         try:
-            dataset_content = AstraAdmin().get_data_set(experiment_id, definition)
+            dataset_content = get_data_set(experiment_id, definition)
             
             if is_valid_dataset_content(dataset_content):
                 content_length = len(dataset_content)
-                lines = len(dataset_content.split('\n'))
+                lines = dataset_content.count('\n') + 1
                 
                 log(f"  ✓ FOUND: '{definition}' - {content_length} chars, {lines} lines")
-                working_datasets.append((definition, dataset_content))
-                
-                # Export each working dataset 
-                filename = f"working_dataset_{i:02d}_{definition.replace(' ', '_').replace('|', '_').replace(':', '_')}_{timestamp}.csv"
-                # Clean up filename
-                filename = "".join(c for c in filename if c.isalnum() or c in "._-")
-                filepath = os.path.join(results_dir, filename)
-                
-                try:
-                    success = AstraAdmin().save_data_set(experiment_id, definition, filepath)
-                    if success and os.path.exists(filepath):
-                        size = os.path.getsize(filepath)
-                        log(f"    → Exported to: {filename} ({size:,} bytes)")
-                    else:
-                        log(f"    → Export failed for: {definition}")
-                except Exception as exp_error:
-                    log(f"    → Export error: {exp_error}")
+                working_datasets.append((i, definition, dataset_content))
                     
             # Don't log every failure to keep output clean
             elif definition in ["rms radius vs volume"]:  # Only log expected ones that fail
@@ -196,12 +208,39 @@ def main():
             if "'_empty' object" not in str(e):
                 log(f"  ✗ '{definition}' - error: {e}")
     
+    # Only a full discovery run is cached. If a cached definition stopped
+    # working, the entry is dropped so the next run discovers everything again
+    working_definitions = [definition for _, definition, _ in working_datasets]
+    try:
+        if cached_definitions is None:
+            save_cached_definitions(RESULTS_DIR, target_file, CACHE_SCRIPT, working_definitions)
+        elif len(working_definitions) < len(cached_definitions):
+            save_cached_definitions(RESULTS_DIR, target_file, CACHE_SCRIPT, [])
+    except OSError as e:
+        log(f"⚠ Could not update dataset cache: {e}")
+    
+    # Export pass: save each working dataset
+    log(f"Exporting {len(working_datasets)} working datasets...", flush=True)
+    for i, definition, _ in working_datasets:
+        filename = f"working_dataset_{i:02d}_{sanitize_filename(definition, _FILENAME_TABLE)}{csv_suffix}"
+        filepath = RESULTS_DIR / filename
+        
+        try:
+            success = save_data_set(experiment_id, definition, str(filepath))
+            size = get_file_size(filepath) if success else None
+            if size is not None:
+                log(f"    → Exported '{definition}' to: {filename} ({size:,} bytes)", flush=True)
+            else:
+                log(f"    → Export failed for: {definition}", flush=True)
+        except Exception as exp_error:
+            log(f"    → Export error: {exp_error}", flush=True)
+    
     # Summary
     log("=== Search Results ===")
     if working_datasets:
         log(f"🎉 Found {len(working_datasets)} working dataset definitions:")
-        for definition, content in working_datasets:
-            preview = content.split('\n')[0] if content else ""
+        for _, definition, content in working_datasets:
+            preview = first_lines(content, 1)[0] if content else ""
             log(f"  ✓ '{definition}' - {preview[:80]}...")
             
         log(f"\n💾 Exported {len(working_datasets)} CSV files to results folder")
@@ -211,9 +250,10 @@ def main():
         log("❌ No working dataset definitions found (unexpected)")
     
     # Cleanup
+    log("=== Cleanup ===", flush=True)
     try:
-        AstraAdmin().close_experiment(experiment_id)
-        AstraAdmin().dispose()
+        admin.close_experiment(experiment_id)
+        admin.dispose()
         log("✓ Cleanup complete")
     except Exception as e:
         log(f"⚠ Cleanup warning: {e}")
@@ -8,12 +8,11 @@ by exploring what dataset definitions are available.
 
 import os
 from datetime import datetime
+from pathlib import Path
 from astra_admin import AstraAdmin
+from gpc_utils import log
 
-def log(message: str):
-    """Log with timestamp"""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    print(f"[{timestamp}] {message}")
+RESULTS_DIR = Path(r"C:\Users\Administrator.WS\Desktop\wyatt-api\gpc-automation\results")
 
 def main():
     """
@@ -22,30 +21,28 @@ def main():
     log("🔍 Dataset Export Debug")
     
     # First, let's see if there are any experiment files we can work with
-    results_dir = r"C:\Users\Administrator.WS\Desktop\wyatt-api\gpc-automation\results"
-    
-    # Look for existing experiment files
     experiment_files = []
-    if os.path.exists(results_dir):
-        for file in os.listdir(results_dir):
-            if file.endswith('.afe8'):
-                experiment_files.append(os.path.join(results_dir, file))
+    if RESULTS_DIR.is_dir():
+        with os.scandir(RESULTS_DIR) as entries:
+            for entry in entries:
+                if entry.name.endswith('.afe8'):
+                    experiment_files.append((entry.name, entry.stat().st_mtime))
     
     if not experiment_files:
         log("❌ No experiment files found to test dataset export")
         return False
         
     log(f"📁 Found {len(experiment_files)} experiment files:")
-    for file in experiment_files:
-        log(f"  → {os.path.basename(file)}")
+    for filename, _ in experiment_files:
+        log(f"  → {filename}")
     
     # Use the most recent experiment file
-    latest_file = max(experiment_files, key=os.path.getmtime)
-    log(f"🎯 Using latest file: {os.path.basename(latest_file)}")
+    latest_file = max(experiment_files, key=lambda x: x[1])[0]
+    log(f"🎯 Using latest file: {latest_file}")
     
     try:
         # Try to open the experiment and get dataset info
-        log("🔧 Attempting to analyze experiment for available datasets...")
+        log("🔧 Attempting to analyze experiment for available datasets...", flush=True)
         
         # This might give us clues about what went wrong
         admin = AstraAdmin()
@@ -84,10 +81,10 @@ def main():
         ]
         
         log("🧪 Testing dataset export patterns...")
-        test_timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        csv_suffix = f"_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         
         for i, pattern in enumerate(dataset_patterns):
-            test_file = os.path.join(results_dir, f"test_dataset_{i:02d}_{test_timestamp}.csv")
+            test_file = RESULTS_DIR / f"test_dataset_{i:02d}{csv_suffix}"
             
             try:
                 log(f"  Testing: '{pattern}'")
@@ -96,7 +93,7 @@ def main():
                 # so this debug approach has limitations
                 # Let's at least log what we're trying
                 
-                log(f"    → Would try to export to: test_dataset_{i:02d}_{test_timestamp}.csv")
+                log(f"    → Would try to export to: {test_file.name}")
                 
             except Exception as e:
                 log(f"    → Error: {e}")
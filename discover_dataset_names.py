@@ -9,23 +9,22 @@ by calling the COM method directly.
 import os
 import uuid
 from datetime import datetime
+from pathlib import Path
 from astra_admin import AstraAdmin
+from gpc_utils import filename_table, get_file_size, list_dataset_names, log, sanitize_filename
 
-def log(message: str):
-    """Log with timestamp"""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    print(f"[{timestamp}] {message}")
+RESULTS_DIR = Path(r"C:\Users\Administrator.WS\Desktop\wyatt-api\gpc-automation\results")
+
+# Spaces become "_", anything else that isn't alphanumeric or "-_" is dropped
+_FILENAME_TABLE = filename_table("-_", to_underscore=" ")
 
 def get_data_set_names_direct(admin, experiment_id):
     """
-    Call GetDataSetNames directly on the COM object
+    Call GetDataSetNames on the COM object through the wrapper's try_get
     This method is missing from the Python wrapper
     """
     try:
-        # Access the underlying COM object directly
-        com_object = admin.astra_com
-        dataset_names = com_object.GetDataSetNames(experiment_id)
-        return dataset_names
+        return list_dataset_names(admin, experiment_id)
     except Exception as e:
         log(f"Error calling GetDataSetNames: {e}")
         return None
@@ -36,32 +35,30 @@ def main():
     """
     log("🔍 Using Missing GetDataSetNames Method")
     
-    # Setup
-    results_dir = r"C:\Users\Administrator.WS\Desktop\wyatt-api\gpc-automation\results"
-    target_file = os.path.join(results_dir, "collected_experiment_20260113_114325.aex.afe8")
+    target_file = RESULTS_DIR / "collected_experiment_20260113_114325.aex.afe8"
     
-    if not os.path.exists(target_file):
+    if not target_file.is_file():
         log(f"❌ Experiment file not found: {target_file}")
         return False
     
-    log(f"📁 Using experiment: {os.path.basename(target_file)}")
+    log(f"📁 Using experiment: {target_file.name}")
     
     # Setup ASTRA connection
-    log("=== Setting up ASTRA Connection ===")
+    log("=== Setting up ASTRA Connection ===", flush=True)
     client_id = uuid.uuid4().hex
     
     try:
         admin = AstraAdmin()
         admin.set_automation_identity("DataSet Names Finder", "1.0.0.0", os.getpid(), client_id, 1)
         admin.wait_for_instruments()
-        experiment_id = admin.open_experiment(target_file)
+        experiment_id = admin.open_experiment(str(target_file))
         log(f"✓ Experiment opened - ID: {experiment_id}")
     except Exception as e:
         log(f"✗ Error setting up ASTRA: {e}")
         return False
     
     # Try to get all dataset names using the missing method
-    log("=== Calling GetDataSetNames (Missing Method) ===")
+    log("=== Calling GetDataSetNames (Missing Method) ===", flush=True)
     dataset_names = get_data_set_names_direct(admin, experiment_id)
     
     if dataset_names:
@@ -74,34 +71,24 @@ def main():
         
         # Now test each discovered dataset definition
         working_datasets = []
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        # Same for every export, so build the file name suffix once
+        csv_suffix = f"_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        
+        # Bound once outside the loops; still goes through the wrapper's try_get/rlock
+        get_data_set, save_data_set = admin.get_data_set, admin.save_data_set
         
+        # Probe pass: only GetDataSet calls, so the ASTRA round-trips run back-to-back
         for i, definition_name in enumerate(dataset_names):
             try:
-                log(f"Testing: '{definition_name}'")
-                dataset_content = admin.get_data_set(experiment_id, definition_name)
+                log(f"Testing: '{definition_name}'", flush=True)
+                dataset_content = get_data_set(experiment_id, definition_name)
                 
-                if dataset_content and hasattr(dataset_content, 'strip') and len(dataset_content.strip()) > 10:
+                if isinstance(dataset_content, str) and len(dataset_content) > 10 and not dataset_content.isspace():
                     content_length = len(dataset_content)
-                    lines = len(dataset_content.split('\n'))
+                    lines = dataset_content.count('\n') + 1
                     
                     log(f"  ✓ VALID: {content_length} chars, {lines} lines")
-                    working_datasets.append((definition_name, dataset_content))
-                    
-                    # Export this dataset
-                    safe_name = "".join(c for c in definition_name if c.isalnum() or c in " -_").replace(" ", "_")
-                    filename = f"discovered_dataset_{i:02d}_{safe_name}_{timestamp}.csv"
-                    filepath = os.path.join(results_dir, filename)
-                    
-                    try:
-                        success = admin.save_data_set(experiment_id, definition_name, filepath)
-                        if success and os.path.exists(filepath):
-                            size = os.path.getsize(filepath)
-                            log(f"    → Exported: {filename} ({size:,} bytes)")
-                        else:
-                            log(f"    → Export failed")
-                    except Exception as exp_error:
-                        log(f"    → Export error: {exp_error}")
+                    working_datasets.append((i, definition_name))
                         
                 else:
                     log(f"  → Empty or invalid data")
@@ -112,13 +99,30 @@ def main():
                 else:
                     log(f"  → Empty dataset")
         
+        # Export pass: all SaveDataSet calls back-to-back (ASTRA has no multi-dataset export)
+        log(f"Exporting {len(working_datasets)} working datasets...", flush=True)
+        for i, definition_name in working_datasets:
+            safe_name = sanitize_filename(definition_name, _FILENAME_TABLE)
+            filename = f"discovered_dataset_{i:02d}_{safe_name}{csv_suffix}"
+            filepath = RESULTS_DIR / filename
+            
+            try:
+                success = save_data_set(experiment_id, definition_name, str(filepath))
+                size = get_file_size(filepath) if success else None
+                if size is not None:
+                    log(f"  → Exported '{definition_name}': {filename} ({size:,} bytes)", flush=True)
+                else:
+                    log(f"  → Export failed for: {definition_name}", flush=True)
+            except Exception as exp_error:
+                log(f"  → Export error for '{definition_name}': {exp_error}", flush=True)
+        
         log("=== Final Results ===")
         log(f"🎯 Discovered {len(dataset_names)} total dataset definitions")
         log(f"✅ Found {len(working_datasets)} with valid data")
         
         if working_datasets:
             log("\nWorking dataset definitions:")
-            for name, _ in working_datasets:
+            for _, name in working_datasets:
                 log(f"  ✓ '{name}'")
                 
     else:
@@ -126,6 +130,7 @@ def main():
         log("💡 This explains why we had to guess dataset definition names")
     
     # Cleanup
+    log("=== Cleanup ===", flush=True)
     try:
         admin.close_experiment(experiment_id)
         admin.dispose()
@@ -10,12 +10,14 @@ This script:
 5. Saves a summary text file with all results
 """
 
+import io
 import os
+import sys
 import uuid
-import re
-import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from astra_admin import AstraAdmin
+from astra_xml_parse import extract_peak_results
 
 # =============================================================================
 # CONFIGURATION PARAMETERS
@@ -47,6 +49,17 @@ SHOW_MOLECULAR_WEIGHTS_IN_TERMINAL = True
 PDI_DECIMAL_PLACES = 3  # Extra precision for polydispersity
 MW_DECIMAL_PLACES = 1   # Standard precision for molecular weights
 
+# Value + uncertainty templates for format_value_with_uncertainty,
+# indexed by [value >= 1000][extra_precision]
+VALUE_FORMATS = tuple(
+    (f"{value_format} (±{{:.{MW_DECIMAL_PLACES}f}}%)",
+     f"{value_format} (±{{:.{PDI_DECIMAL_PLACES}f}}%)")
+    for value_format in ("{:.1f}", "{:.3e}")
+)
+
+# XML Parsing Settings
+XML_READ_BUFFER_SIZE = 1 << 20  # 1 MB read buffer for the results file
+
 # Timeout Settings (if needed in future)
 INSTRUMENT_WAIT_TIMEOUT = 300  # seconds
 COLLECTION_TIMEOUT = 1800      # 30 minutes max collection time
@@ -58,245 +71,100 @@ def log(message: str):
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     print(f"[{timestamp}] {message}")
 
-def extract_peak_results(xml_content):
-    """Extract peak molecular weight results from ASTRA XML"""
-    try:
-        lines = xml_content.split('\n')
-        peak_data = {}
-        
-        for i, line in enumerate(lines):
-            line = line.strip()
-            
-            # Look for molar mass results
-            if '<result type="molar mass">' in line:
-                if i + 1 < len(lines) and i + 2 < len(lines):
-                    name_line = lines[i + 1].strip()
-                    scalar_line = lines[i + 2].strip()
-                    
-                    # Extract name
-                    name_match = re.search(r'<name>(.+?)</name>', name_line)
-                    if name_match:
-                        name = name_match.group(1)
-                        
-                        # Handle different XML attribute orders
-                        scalar_match = re.search(r'<scalar.*?units="([^"]*)".*?uncertainty="([^"]*)".*?peak="(\d+)".*?>([^<]*)</scalar>', scalar_line)
-                        
-                        if not scalar_match:
-                            scalar_match = re.search(r'<scalar.*?units="([^"]*)".*?peak="(\d+)".*?uncertainty="([^"]*)".*?>([^<]*)</scalar>', scalar_line)
-                            if scalar_match:
-                                units = scalar_match.group(1)
-                                peak_num = int(scalar_match.group(2))
-                                uncertainty = float(scalar_match.group(3))
-                                value_str = scalar_match.group(4).strip()
-                        else:
-                            units = scalar_match.group(1)
-                            uncertainty = float(scalar_match.group(2))
-                            peak_num = int(scalar_match.group(3))
-                            value_str = scalar_match.group(4).strip()
-                        
-                        if scalar_match and value_str != 'n/a':
-                            value = float(value_str)
-                            pct_uncertainty = (uncertainty / value) * 100
-                            
-                            if peak_num not in peak_data:
-                                peak_data[peak_num] = {}
-                            
-                            peak_data[peak_num][name] = {
-                                'value': value,
-                                'units': units,
-                                'uncertainty_pct': pct_uncertainty
-                            }
-            
-            # Look for polydispersity (PDI)
-            elif '<result type="polydispersity">' in line:
-                if i + 1 < len(lines) and i + 2 < len(lines):
-                    name_line = lines[i + 1].strip()
-                    if '<name>Mw/Mn</name>' in name_line:
-                        scalar_line = lines[i + 2].strip()
-                        scalar_match = re.search(r'<scalar.*?uncertainty="([^"]*)".*?peak="(\d+)".*?>([^<]*)</scalar>', scalar_line)
-                        
-                        if not scalar_match:
-                            scalar_match = re.search(r'<scalar.*?peak="(\d+)".*?uncertainty="([^"]*)".*?>([^<]*)</scalar>', scalar_line)
-                            if scalar_match:
-                                peak_num = int(scalar_match.group(1))
-                                uncertainty = float(scalar_match.group(2))
-                                value = float(scalar_match.group(3))
-                        else:
-                            uncertainty = float(scalar_match.group(1))
-                            peak_num = int(scalar_match.group(2))
-                            value = float(scalar_match.group(3))
-                        
-                        if scalar_match:
-                            pct_uncertainty = (uncertainty / value) * 100
-                            
-                            if peak_num not in peak_data:
-                                peak_data[peak_num] = {}
-                            
-                            peak_data[peak_num]['Mw/Mn'] = {
-                                'value': value,
-                                'units': '',
-                                'uncertainty_pct': pct_uncertainty
-                            }
-            
-            # Look for rms radius results  
-            elif '<result type="rms radius">' in line:
-                if i + 1 < len(lines) and i + 2 < len(lines):
-                    name_line = lines[i + 1].strip()
-                    scalar_line = lines[i + 2].strip()
-                    
-                    name_match = re.search(r'<name>(.+?)</name>', name_line)
-                    if name_match and name_match.group(1) == 'rz':
-                        scalar_match = re.search(r'<scalar.*?units="([^"]*)".*?uncertainty="([^"]*)".*?peak="(\d+)".*?>([^<]*)</scalar>', scalar_line)
-                        
-                        if not scalar_match:
-                            scalar_match = re.search(r'<scalar.*?units="([^"]*)".*?peak="(\d+)".*?uncertainty="([^"]*)".*?>([^<]*)</scalar>', scalar_line)
-                            if scalar_match:
-                                units = scalar_match.group(1)
-                                peak_num = int(scalar_match.group(2))
-                                uncertainty = float(scalar_match.group(3))
-                                value_str = scalar_match.group(4).strip()
-                        else:
-                            units = scalar_match.group(1)
-                            uncertainty = float(scalar_match.group(2))
-                            peak_num = int(scalar_match.group(3))
-                            value_str = scalar_match.group(4).strip()
-                        
-                        if scalar_match and value_str != 'n/a':
-                            value = float(value_str)
-                            pct_uncertainty = (uncertainty / value) * 100
-                            
-                            if peak_num not in peak_data:
-                                peak_data[peak_num] = {}
-                            
-                            peak_data[peak_num]['rz'] = {
-                                'value': value,
-                                'units': units,
-                                'uncertainty_pct': pct_uncertainty
-                            }
-        
-        return peak_data
-        
-    except Exception as e:
-        log(f"Error parsing XML: {e}")
-        return {}
+def extract_peak_results_and_close(results_file):
+    """Run extract_peak_results on an open results file, then close it"""
+    with results_file:
+        return extract_peak_results(results_file)
 
 def format_value_with_uncertainty(value, units, uncertainty_pct, extra_precision=False):
     """Format value with uncertainty like ASTRA GUI"""
-    if value >= 1000:
-        formatted_value = f"{value:.3e}"
-    else:
-        formatted_value = f"{value:.1f}"
-    
-    # Use configurable precision
-    precision = f".{PDI_DECIMAL_PLACES}f" if extra_precision else f".{MW_DECIMAL_PLACES}f"
-    return f"{formatted_value} (±{uncertainty_pct:{precision}}%)"
+    # Scientific notation from 1000 up; template precomputed per precision
+    return VALUE_FORMATS[value >= 1000][extra_precision].format(value, uncertainty_pct)
+
+# Fixed text of the results summary, built once rather than on every call
+SUMMARY_BANNER = "=" * 50
+PEAK_DIVIDER = "-" * 30
+SUMMARY_TITLE = "🎯 MOLECULAR WEIGHT ANALYSIS RESULTS"
+PEAK_HEADER = "\n🔬 Peak {}"
+MASS_HEADER = "📊 Molar mass moments (g/mol)"
+PDI_HEADER = "📈 Polydispersity"
+RADIUS_HEADER = "🔵 RMS radius moments (nm)"
+SUMMARY_FOOTER = (
+    f"{SUMMARY_BANNER}\n"
+    "✅ SUCCESS: Complete molecular weight analysis!\n"
+    "💾 All data saved to timestamped results folder\n"
+    f"{SUMMARY_BANNER}\n"
+)
 
 def display_and_save_results(peak_data, results_folder):
     """Display results in terminal and save summary to file"""
-    summary_lines = []
+    # Terminal and summary file get the same text, so build it once
+    buf = io.StringIO()
     
-    print("\n" + "="*50)
-    print("🎯 MOLECULAR WEIGHT ANALYSIS RESULTS")
-    print("="*50)
+    def emit(line=""):
+        buf.write(line)
+        buf.write("\n")
     
-    summary_lines.append("="*50)
-    summary_lines.append("🎯 MOLECULAR WEIGHT ANALYSIS RESULTS")
-    summary_lines.append("="*50)
+    emit(SUMMARY_BANNER)
+    emit(SUMMARY_TITLE)
+    emit(SUMMARY_BANNER)
     
     for peak_num in sorted(peak_data.keys()):
         data = peak_data[peak_num]
         
-        peak_header = f"🔬 Peak {peak_num}"
-        peak_divider = "-" * 30
-        
-        print(f"\n{peak_header}")
-        print(peak_divider)
-        
-        summary_lines.append(f"\n{peak_header}")
-        summary_lines.append(peak_divider)
+        emit(PEAK_HEADER.format(peak_num))
+        emit(PEAK_DIVIDER)
         
         # Molar mass moments
         if any(key in data for key in ['Mn', 'Mw', 'Mp', 'Mz']):
-            mass_header = "📊 Molar mass moments (g/mol)"
-            print(mass_header)
-            print()
-            
-            summary_lines.append(mass_header)
-            summary_lines.append("")
+            emit(MASS_HEADER)
+            emit()
             
             if 'Mn' in data:
-                mn = data['Mn']
-                formatted = format_value_with_uncertainty(mn['value'], mn['units'], mn['uncertainty_pct'])
-                line = f"  Mn: {formatted}"
-                print(line)
-                summary_lines.append(line)
+                formatted = format_value_with_uncertainty(*data['Mn'])
+                emit(f"  Mn: {formatted}")
             
             if 'Mw' in data:
-                mw = data['Mw']
-                formatted = format_value_with_uncertainty(mw['value'], mw['units'], mw['uncertainty_pct'])
-                line = f"  Mw: {formatted}"
-                print(line)
-                summary_lines.append(line)
+                formatted = format_value_with_uncertainty(*data['Mw'])
+                emit(f"  Mw: {formatted}")
                 
             if 'Mp' in data:
-                mp = data['Mp'] 
-                formatted = format_value_with_uncertainty(mp['value'], mp['units'], mp['uncertainty_pct'])
-                line = f"  Mp: {formatted}"
-                print(line)
-                summary_lines.append(line)
+                formatted = format_value_with_uncertainty(*data['Mp'])
+                emit(f"  Mp: {formatted}")
             
-            print()
-            summary_lines.append("")
+            emit()
         
         # Polydispersity with extra precision
         if 'Mw/Mn' in data:
-            pdi_header = "📈 Polydispersity"
-            print(pdi_header)
-            print()
-            
-            summary_lines.append(pdi_header)
-            summary_lines.append("")
-            
-            pdi = data['Mw/Mn']
-            formatted = format_value_with_uncertainty(pdi['value'], '', pdi['uncertainty_pct'], extra_precision=True)
-            line = f"  Mw/Mn: {formatted}"
-            print(line)
-            print()
+            emit(PDI_HEADER)
+            emit()
             
-            summary_lines.append(line)
-            summary_lines.append("")
+            formatted = format_value_with_uncertainty(*data['Mw/Mn'], extra_precision=True)
+            emit(f"  Mw/Mn: {formatted}")
+            emit()
         
         # RMS radius
         if 'rz' in data:
-            radius_header = "🔵 RMS radius moments (nm)"
-            print(radius_header)
-            print()
-            
-            summary_lines.append(radius_header)
-            summary_lines.append("")
-            
-            rz = data['rz']
-            formatted = format_value_with_uncertainty(rz['value'], rz['units'], rz['uncertainty_pct'])
-            line = f"  rz: {formatted}"
-            print(line)
-            print()
+            emit(RADIUS_HEADER)
+            emit()
             
-            summary_lines.append(line)
-            summary_lines.append("")
+            formatted = format_value_with_uncertainty(*data['rz'])
+            emit(f"  rz: {formatted}")
+            emit()
+    
+    summary_text = buf.getvalue()
+    sys.stdout.write("\n" + summary_text)
     
     # Save summary to file
     summary_file = os.path.join(results_folder, "molecular_weight_summary.txt")
     try:
-        with open(summary_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(summary_lines))
+        with open(summary_file, 'w', encoding='utf-8', buffering=1 << 16) as f:
+            f.write(summary_text)
         log(f"✓ Molecular weight summary saved to: {os.path.basename(summary_file)}")
     except Exception as e:
         log(f"⚠ Warning: Could not save summary file: {e}")
     
-    print("="*50)
-    print("✅ SUCCESS: Complete molecular weight analysis!")
-    print("💾 All data saved to timestamped results folder")
-    print("="*50)
+    sys.stdout.write(SUMMARY_FOOTER)
 
 def main():
     """Enhanced GPC automation with organized data saving"""
@@ -321,6 +189,8 @@ def main():
     
     admin = None
     experiment_id = None
+    parse_pool = ThreadPoolExecutor(max_workers=1)
+    parse_future = None
     
     try:
         # Step 1: Set automation identity
@@ -395,27 +265,24 @@ def main():
             
             admin.save_results(experiment_id, results_path)
             
-            if os.path.exists(results_path):
-                results_size = os.path.getsize(results_path)
+            # Open the export once: the size comes from the open handle and the
+            # same buffered handle is handed to the parser
+            try:
+                results_file = open(results_path, 'rb', buffering=XML_READ_BUFFER_SIZE)
+            except OSError:
+                results_file = None
+            
+            if results_file is not None:
+                results_size = os.fstat(results_file.fileno()).st_size
                 log(f"✓ XML results exported: {results_size:,} bytes")
                 
-                # Extract and display molecular weight data
+                # Extract molecular weight data; parsing doesn't touch ASTRA,
+                # so it runs in a worker thread while the CSVs are exported
                 if SHOW_MOLECULAR_WEIGHTS_IN_TERMINAL:
-                    try:
-                        with open(results_path, 'r', encoding='utf-8') as f:
-                            xml_content = f.read()
-                        
-                        log("🔬 Extracting molecular weight data...")
-                        peak_data = extract_peak_results(xml_content)
-                        
-                        if peak_data:
-                            # Display results in terminal and save summary
-                            display_and_save_results(peak_data, run_results_folder)
-                        else:
-                            log("⚠ No molecular weight data found in XML")
-                            
-                    except Exception as extract_error:
-                        log(f"⚠ Warning: Could not extract molecular weights: {extract_error}")
+                    log("🔬 Extracting molecular weight data...")
+                    parse_future = parse_pool.submit(extract_peak_results_and_close, results_file)
+                else:
+                    results_file.close()
         
         # Step 12: Export CSV datasets
         if EXPORT_CSV_DATASETS:
@@ -444,6 +311,20 @@ def main():
             
             log(f"✓ Exported {exported_csv_count} CSV dataset files")
         
+        # Display molecular weight data once the background parse is done
+        if parse_future is not None:
+            try:
+                peak_data = parse_future.result()
+                
+                if peak_data:
+                    # Display results in terminal and save summary
+                    display_and_save_results(peak_data, run_results_folder)
+                else:
+                    log("⚠ No molecular weight data found in XML")
+                    
+            except Exception as extract_error:
+                log(f"⚠ Warning: Could not extract molecular weights: {extract_error}")
+        
         # Step 13: Final Summary
         log("=== Step 13: Complete! ===")
         log("📁 All data saved to timestamped results folder:")
@@ -467,6 +348,7 @@ def main():
     finally:
         # Always clean up properly
         log("=== Cleanup ===")
+        parse_pool.shutdown()
         
         if experiment_id is not None and admin is not None:
             try:
@@ -13,11 +13,14 @@ Based on the official ASTRA SDK command_line_app.py run_sequence() method.
 """
 
 import os
+import sys
 import uuid
-import re
-import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
 from astra_admin import AstraAdmin, SampleInfo
+from astra_xml_parse import extract_peak_results
+from gpc_utils import get_file_size, log
 
 # =============================================================================
 # CONFIGURATION PARAMETERS
@@ -60,286 +63,182 @@ DATASET_EXPORTS = [
 SHOW_MOLECULAR_WEIGHTS_IN_TERMINAL = True
 PDI_DECIMAL_PLACES = 3  # Extra precision for polydispersity
 MW_DECIMAL_PLACES = 1   # Standard precision for molecular weights
+# Emoji in terminal output; off by default unless the console is UTF-8
+USE_EMOJI = (sys.stdout.encoding or '').lower().replace('-', '') == 'utf8'
+
+# XML Parsing Settings
+XML_READ_BUFFER_SIZE = 1 << 20  # 1 MB read buffer for the results file
+
+# Uncertainty format specs built from the precision settings above
+PDI_UNCERTAINTY_SPEC = f".{PDI_DECIMAL_PLACES}f"
+MW_UNCERTAINTY_SPEC = f".{MW_DECIMAL_PLACES}f"
 
 # =============================================================================
 
-def log(message: str):
-    """Log with timestamp"""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    print(f"[{timestamp}] {message}")
+# Terminal symbols, chosen once from USE_EMOJI. Each one carries its
+# trailing space; with emoji off the status symbols become ASCII tags and
+# the decorative ones are left out
+EMO_OK = "✓ " if USE_EMOJI else "[OK] "
+EMO_SUCCESS = "✅ " if USE_EMOJI else "[OK] "
+EMO_WARN = "⚠ " if USE_EMOJI else "[WARN] "
+EMO_ERROR = "✗ " if USE_EMOJI else "[ERROR] "
+EMO_FAIL = "❌ " if USE_EMOJI else "[ERROR] "
+EMO_TARGET = "🎯 " if USE_EMOJI else ""
+EMO_MICROSCOPE = "🔬 " if USE_EMOJI else ""
+EMO_CHART = "📊 " if USE_EMOJI else ""
+EMO_TREND = "📈 " if USE_EMOJI else ""
+EMO_CIRCLE = "🔵 " if USE_EMOJI else ""
+EMO_DISK = "💾 " if USE_EMOJI else ""
+EMO_ROCKET = "🚀 " if USE_EMOJI else ""
+EMO_CLIPBOARD = "📋 " if USE_EMOJI else ""
+EMO_FOLDER = "📁 " if USE_EMOJI else ""
+EMO_TEST_TUBE = "🧪 " if USE_EMOJI else ""
+EMO_OPEN_FOLDER = "📂 " if USE_EMOJI else ""
+EMO_PAGE = "📄 " if USE_EMOJI else ""
+EMO_MEMO = "📝 " if USE_EMOJI else ""
+EMO_PARTY = "🎉 " if USE_EMOJI else ""
+PLUS_MINUS = "±" if USE_EMOJI else "+/-"
+
+# Summary symbols (title, peak, molar mass, polydispersity, rms radius,
+# plus-minus): the UTF-8 summary file always gets the real ones, the
+# terminal copy the console ones above
+FILE_SUMMARY_SYMBOLS = ("🎯 ", "🔬 ", "📊 ", "📈 ", "🔵 ", "±")
+CONSOLE_SUMMARY_SYMBOLS = (EMO_TARGET, EMO_MICROSCOPE, EMO_CHART, EMO_TREND, EMO_CIRCLE, PLUS_MINUS)
+
+if not USE_EMOJI and hasattr(sys.stdout, "reconfigure"):
+    # Any other text the console can't encode (paths, error messages)
+    # is shown as "?" rather than raising
+    sys.stdout.reconfigure(errors='replace')
 
 def progress_callback(message: str):
     """Progress callback for collect_data method"""
-    log(f"ASTRA: {message}")
+    log(f"ASTRA: {message}", flush=True)
 
-def extract_peak_results(xml_content):
-    """Extract peak molecular weight results from ASTRA XML"""
-    try:
-        lines = xml_content.split('\n')
-        peak_data = {}
-        
-        for i, line in enumerate(lines):
-            line = line.strip()
-            
-            # Look for molar mass results
-            if '<result type="molar mass">' in line:
-                if i + 1 < len(lines) and i + 2 < len(lines):
-                    name_line = lines[i + 1].strip()
-                    scalar_line = lines[i + 2].strip()
-                    
-                    # Extract name
-                    name_match = re.search(r'<name>(.+?)</name>', name_line)
-                    if name_match:
-                        name = name_match.group(1)
-                        
-                        # Handle different XML attribute orders
-                        scalar_match = re.search(r'<scalar.*?units="([^"]*)".*?uncertainty="([^"]*)".*?peak="(\d+)".*?>([^<]*)</scalar>', scalar_line)
-                        
-                        if not scalar_match:
-                            scalar_match = re.search(r'<scalar.*?units="([^"]*)".*?peak="(\d+)".*?uncertainty="([^"]*)".*?>([^<]*)</scalar>', scalar_line)
-                            if scalar_match:
-                                units = scalar_match.group(1)
-                                peak_num = int(scalar_match.group(2))
-                                uncertainty = float(scalar_match.group(3))
-                                value_str = scalar_match.group(4).strip()
-                        else:
-                            units = scalar_match.group(1)
-                            uncertainty = float(scalar_match.group(2))
-                            peak_num = int(scalar_match.group(3))
-                            value_str = scalar_match.group(4).strip()
-                        
-                        if scalar_match and value_str != 'n/a' and value_str != '~Invalid':
-                            value = float(value_str)
-                            pct_uncertainty = (uncertainty / value) * 100
-                            
-                            if peak_num not in peak_data:
-                                peak_data[peak_num] = {}
-                            
-                            peak_data[peak_num][name] = {
-                                'value': value,
-                                'units': units,
-                                'uncertainty_pct': pct_uncertainty
-                            }
-            
-            # Look for polydispersity (PDI)
-            elif '<result type="polydispersity">' in line:
-                if i + 1 < len(lines) and i + 2 < len(lines):
-                    name_line = lines[i + 1].strip()
-                    if '<name>Mw/Mn</name>' in name_line:
-                        scalar_line = lines[i + 2].strip()
-                        scalar_match = re.search(r'<scalar.*?uncertainty="([^"]*)".*?peak="(\d+)".*?>([^<]*)</scalar>', scalar_line)
-                        
-                        if not scalar_match:
-                            scalar_match = re.search(r'<scalar.*?peak="(\d+)".*?uncertainty="([^"]*)".*?>([^<]*)</scalar>', scalar_line)
-                            if scalar_match:
-                                peak_num = int(scalar_match.group(1))
-                                uncertainty = float(scalar_match.group(2))
-                                value_str = scalar_match.group(3).strip()
-                        else:
-                            uncertainty = float(scalar_match.group(1))
-                            peak_num = int(scalar_match.group(2))
-                            value_str = scalar_match.group(3).strip()
-                        
-                        if scalar_match and value_str != 'n/a' and value_str != '~Invalid':
-                            value = float(value_str)
-                            pct_uncertainty = (uncertainty / value) * 100
-                            
-                            if peak_num not in peak_data:
-                                peak_data[peak_num] = {}
-                            
-                            peak_data[peak_num]['Mw/Mn'] = {
-                                'value': value,
-                                'units': '',
-                                'uncertainty_pct': pct_uncertainty
-                            }
-            
-            # Look for rms radius results  
-            elif '<result type="rms radius">' in line:
-                if i + 1 < len(lines) and i + 2 < len(lines):
-                    name_line = lines[i + 1].strip()
-                    scalar_line = lines[i + 2].strip()
-                    
-                    name_match = re.search(r'<name>(.+?)</name>', name_line)
-                    if name_match and name_match.group(1) == 'rz':
-                        scalar_match = re.search(r'<scalar.*?units="([^"]*)".*?uncertainty="([^"]*)".*?peak="(\d+)".*?>([^<]*)</scalar>', scalar_line)
-                        
-                        if not scalar_match:
-                            scalar_match = re.search(r'<scalar.*?units="([^"]*)".*?peak="(\d+)".*?uncertainty="([^"]*)".*?>([^<]*)</scalar>', scalar_line)
-                            if scalar_match:
-                                units = scalar_match.group(1)
-                                peak_num = int(scalar_match.group(2))
-                                uncertainty = float(scalar_match.group(3))
-                                value_str = scalar_match.group(4).strip()
-                        else:
-                            units = scalar_match.group(1)
-                            uncertainty = float(scalar_match.group(2))
-                            peak_num = int(scalar_match.group(3))
-                            value_str = scalar_match.group(4).strip()
-                        
-                        if scalar_match and value_str != 'n/a' and value_str != '~Invalid':
-                            value = float(value_str)
-                            pct_uncertainty = (uncertainty / value) * 100
-                            
-                            if peak_num not in peak_data:
-                                peak_data[peak_num] = {}
-                            
-                            peak_data[peak_num]['rz'] = {
-                                'value': value,
-                                'units': units,
-                                'uncertainty_pct': pct_uncertainty
-                            }
-        
-        return peak_data
-        
-    except Exception as e:
-        log(f"Error parsing XML: {e}")
-        return {}
+def extract_peak_results_and_close(results_file):
+    """Run extract_peak_results on an open results file, then close it"""
+    with results_file:
+        return extract_peak_results(results_file)
 
-def format_value_with_uncertainty(value, units, uncertainty_pct, extra_precision=False):
+def format_value_with_uncertainty(value, units, uncertainty_pct, extra_precision=False, plus_minus=PLUS_MINUS):
     """Format value with uncertainty like ASTRA GUI"""
     if value >= 1000:
         formatted_value = f"{value:.3e}"
     else:
         formatted_value = f"{value:.1f}"
     
-    # Use configurable precision
-    precision = f".{PDI_DECIMAL_PLACES}f" if extra_precision else f".{MW_DECIMAL_PLACES}f"
-    return f"{formatted_value} (±{uncertainty_pct:{precision}}%)"
+    # Format spec precomputed from the configured precision
+    precision = PDI_UNCERTAINTY_SPEC if extra_precision else MW_UNCERTAINTY_SPEC
+    return f"{formatted_value} ({plus_minus}{uncertainty_pct:{precision}}%)"
 
-def display_and_save_results(peak_data, results_folder):
-    """Display results in terminal and save summary to file"""
+def build_summary_text(peak_data, symbols):
+    """Molecular weight summary text, using the given summary symbols"""
+    target_icon, peak_icon, mass_icon, pdi_icon, radius_icon, plus_minus = symbols
     summary_lines = []
+    emit = summary_lines.append
     
-    print("\n" + "="*50)
-    print("🎯 MOLECULAR WEIGHT ANALYSIS RESULTS")
-    print("="*50)
-    
-    summary_lines.append("="*50)
-    summary_lines.append("🎯 MOLECULAR WEIGHT ANALYSIS RESULTS")
-    summary_lines.append("="*50)
+    emit("="*50)
+    emit(f"{target_icon}MOLECULAR WEIGHT ANALYSIS RESULTS")
+    emit("="*50)
     
     for peak_num in sorted(peak_data.keys()):
         data = peak_data[peak_num]
         
-        peak_header = f"🔬 Peak {peak_num}"
-        peak_divider = "-" * 30
-        
-        print(f"\n{peak_header}")
-        print(peak_divider)
-        
-        summary_lines.append(f"\n{peak_header}")
-        summary_lines.append(peak_divider)
+        emit(f"\n{peak_icon}Peak {peak_num}")
+        emit("-" * 30)
         
         # Molar mass moments
         if any(key in data for key in ['Mn', 'Mw', 'Mp', 'Mz']):
-            mass_header = "📊 Molar mass moments (g/mol)"
-            print(mass_header)
-            print()
-            
-            summary_lines.append(mass_header)
-            summary_lines.append("")
+            emit(f"{mass_icon}Molar mass moments (g/mol)")
+            emit("")
             
             if 'Mn' in data:
-                mn = data['Mn']
-                formatted = format_value_with_uncertainty(mn['value'], mn['units'], mn['uncertainty_pct'])
-                line = f"  Mn: {formatted}"
-                print(line)
-                summary_lines.append(line)
+                formatted = format_value_with_uncertainty(*data['Mn'], plus_minus=plus_minus)
+                emit(f"  Mn: {formatted}")
             
             if 'Mw' in data:
-                mw = data['Mw']
-                formatted = format_value_with_uncertainty(mw['value'], mw['units'], mw['uncertainty_pct'])
-                line = f"  Mw: {formatted}"
-                print(line)
-                summary_lines.append(line)
+                formatted = format_value_with_uncertainty(*data['Mw'], plus_minus=plus_minus)
+                emit(f"  Mw: {formatted}")
                 
             if 'Mp' in data:
-                mp = data['Mp'] 
-                formatted = format_value_with_uncertainty(mp['value'], mp['units'], mp['uncertainty_pct'])
-                line = f"  Mp: {formatted}"
-                print(line)
-                summary_lines.append(line)
+                formatted = format_value_with_uncertainty(*data['Mp'], plus_minus=plus_minus)
+                emit(f"  Mp: {formatted}")
             
-            print()
-            summary_lines.append("")
+            emit("")
         
         # Polydispersity with extra precision
         if 'Mw/Mn' in data:
-            pdi_header = "📈 Polydispersity"
-            print(pdi_header)
-            print()
-            
-            summary_lines.append(pdi_header)
-            summary_lines.append("")
+            emit(f"{pdi_icon}Polydispersity")
+            emit("")
             
-            pdi = data['Mw/Mn']
-            formatted = format_value_with_uncertainty(pdi['value'], '', pdi['uncertainty_pct'], extra_precision=True)
-            line = f"  Mw/Mn: {formatted}"
-            print(line)
-            print()
-            
-            summary_lines.append(line)
-            summary_lines.append("")
+            formatted = format_value_with_uncertainty(*data['Mw/Mn'], extra_precision=True, plus_minus=plus_minus)
+            emit(f"  Mw/Mn: {formatted}")
+            emit("")
         
         # RMS radius
         if 'rz' in data:
-            radius_header = "🔵 RMS radius moments (nm)"
-            print(radius_header)
-            print()
-            
-            summary_lines.append(radius_header)
-            summary_lines.append("")
-            
-            rz = data['rz']
-            formatted = format_value_with_uncertainty(rz['value'], rz['units'], rz['uncertainty_pct'])
-            line = f"  rz: {formatted}"
-            print(line)
-            print()
+            emit(f"{radius_icon}RMS radius moments (nm)")
+            emit("")
             
-            summary_lines.append(line)
-            summary_lines.append("")
+            formatted = format_value_with_uncertainty(*data['rz'], plus_minus=plus_minus)
+            emit(f"  rz: {formatted}")
+            emit("")
+    
+    return '\n'.join(summary_lines)
+
+def display_and_save_results(peak_data, results_folder):
+    """Display results in terminal and save summary to file"""
+    # With emoji on, the terminal and the file get the same text
+    summary_text = build_summary_text(peak_data, FILE_SUMMARY_SYMBOLS)
+    console_summary = summary_text if USE_EMOJI else build_summary_text(peak_data, CONSOLE_SUMMARY_SYMBOLS)
+    sys.stdout.write(f"\n{console_summary}\n")
+    sys.stdout.flush()
     
     # Save summary to file
-    summary_file = os.path.join(results_folder, "molecular_weight_summary.txt")
+    summary_file = results_folder / "molecular_weight_summary.txt"
     try:
-        with open(summary_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(summary_lines))
-        log(f"✓ Molecular weight summary saved to: {os.path.basename(summary_file)}")
+        # Encoded once and written as bytes; line endings match what text
+        # mode would have written
+        summary_file.write_bytes(summary_text.replace('\n', os.linesep).encode('utf-8'))
+        log(f"{EMO_OK}Molecular weight summary saved to: {summary_file.name}")
     except Exception as e:
-        log(f"⚠ Warning: Could not save summary file: {e}")
+        log(f"{EMO_WARN}Warning: Could not save summary file: {e}")
     
-    print("="*50)
-    print("✅ SUCCESS: Complete molecular weight analysis!")
-    print("💾 All data saved to timestamped results folder")
-    print("="*50)
+    print(
+        "=" * 50 + "\n"
+        f"{EMO_SUCCESS}SUCCESS: Complete molecular weight analysis!\n"
+        f"{EMO_DISK}All data saved to timestamped results folder\n"
+        + "=" * 50
+    )
 
 def main():
     """Enhanced GPC automation using high-level collect_data method"""
-    log("🚀 Enhanced GPC Automation v2 - Using High-Level collect_data()")
+    log(f"{EMO_ROCKET}Enhanced GPC Automation v2 - Using High-Level collect_data()")
     log("Based on official ASTRA SDK command_line_app.py examples")
     
     # Display current configuration
-    log(f"📋 ASTRA Method: {ASTRA_METHOD_PATH}")
-    log(f"📁 Results Directory: {BASE_RESULTS_DIR}")
-    log(f"🔬 App Identity: {APP_NAME} v{APP_VERSION}")
-    log(f"🧪 Sample: {SAMPLE_NAME} ({SAMPLE_DESCRIPTION})")
+    log(f"{EMO_CLIPBOARD}ASTRA Method: {ASTRA_METHOD_PATH}")
+    log(f"{EMO_FOLDER}Results Directory: {BASE_RESULTS_DIR}")
+    log(f"{EMO_MICROSCOPE}App Identity: {APP_NAME} v{APP_VERSION}")
+    log(f"{EMO_TEST_TUBE}Sample: {SAMPLE_NAME} ({SAMPLE_DESCRIPTION})")
     
     # Create timestamped results folder for this run
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    run_results_folder = os.path.join(BASE_RESULTS_DIR, f"{FOLDER_PREFIX}_{timestamp}")
+    run_results_folder = Path(BASE_RESULTS_DIR) / f"{FOLDER_PREFIX}_{timestamp}"
     
     try:
-        os.makedirs(run_results_folder, exist_ok=True)
-        log(f"📁 Created results folder: {os.path.basename(run_results_folder)}")
+        run_results_folder.mkdir(parents=True, exist_ok=True)
+        log(f"{EMO_FOLDER}Created results folder: {run_results_folder.name}")
     except Exception as e:
-        log(f"❌ Could not create results folder: {e}")
+        log(f"{EMO_FAIL}Could not create results folder: {e}")
         return False
     
     admin = None
+    parse_pool = ThreadPoolExecutor(max_workers=1)
+    parse_future = None
     
     try:
         # Step 1: Set automation identity
-        log("=== Step 1: Setting Automation Identity ===")
+        log("=== Step 1: Setting Automation Identity ===", flush=True)
         client_id = uuid.uuid4().hex
         
         admin = AstraAdmin()
@@ -350,12 +249,12 @@ def main():
             client_id,
             1
         )
-        log("✓ Automation identity set")
+        log(f"{EMO_OK}Automation identity set")
         
         # Step 2: Wait for instruments
-        log("=== Step 2: Waiting for Instruments ===")
+        log("=== Step 2: Waiting for Instruments ===", flush=True)
         admin.wait_for_instruments()
-        log("✓ Instruments detected")
+        log(f"{EMO_OK}Instruments detected")
         
         # Step 3: Create sample information
         log("=== Step 3: Preparing Sample Information ===")
@@ -367,17 +266,17 @@ def main():
             uvExtinction=SAMPLE_UV_EXTINCTION,
             concentration=SAMPLE_CONCENTRATION
         )
-        log(f"✓ Sample configured: {SAMPLE_NAME}")
+        log(f"{EMO_OK}Sample configured: {SAMPLE_NAME}")
         log(f"  dn/dc: {SAMPLE_DNDC} mL/g")
         log(f"  Concentration: {SAMPLE_CONCENTRATION} mg/mL")
         
         # Step 4: Complete data collection using high-level method
         log("=== Step 4: Complete Data Collection (High-Level Method) ===")
         experiment_filename = f"experiment_{timestamp}.aex"
-        experiment_path = os.path.join(run_results_folder, experiment_filename)
+        experiment_path = str(run_results_folder / experiment_filename)
         
         log("Starting complete automated data collection...")
-        log("This includes: experiment creation, data collection, processing, and saving")
+        log("This includes: experiment creation, data collection, processing, and saving", flush=True)
         
         # This is the high-level method from the official examples
         admin.collect_data(
@@ -390,50 +289,48 @@ def main():
             progress_callback       # progress callback function
         )
         
-        log("✓ Complete data collection finished!")
+        log(f"{EMO_OK}Complete data collection finished!")
         
         # Step 5: Verify experiment file was created
-        if os.path.exists(experiment_path):
-            exp_size = os.path.getsize(experiment_path)
-            log(f"✓ Experiment file created: {exp_size:,} bytes")
+        exp_size = get_file_size(experiment_path)
+        if exp_size is not None:
+            log(f"{EMO_OK}Experiment file created: {exp_size:,} bytes")
         else:
-            log("⚠ Warning: Experiment file not found")
+            log(f"{EMO_WARN}Warning: Experiment file not found")
             return False
         
         # Step 6: Open the completed experiment for analysis
-        log("=== Step 5: Opening Completed Experiment for Analysis ===")
+        log("=== Step 5: Opening Completed Experiment for Analysis ===", flush=True)
         experiment_id = admin.open_experiment(experiment_path)
-        log(f"✓ Experiment opened - ID: {experiment_id}")
+        log(f"{EMO_OK}Experiment opened - ID: {experiment_id}")
         
         # Step 7: Export XML results and extract molecular weights
         if EXPORT_XML_RESULTS:
-            log("=== Step 6: Exporting and Analyzing Results ===")
+            log("=== Step 6: Exporting and Analyzing Results ===", flush=True)
             results_filename = f"results_{timestamp}.xml"
-            results_path = os.path.join(run_results_folder, results_filename)
+            results_path = str(run_results_folder / results_filename)
             
-            admin.save_results(experiment_id, results_path)
+            # SaveResults only writes to a file name, so the file is read back
+            # once: its size comes from the open handle, which is then streamed
+            # into the parser
+            results_file = None
+            if admin.save_results(experiment_id, results_path):
+                try:
+                    results_file = open(results_path, 'rb', buffering=XML_READ_BUFFER_SIZE)
+                except OSError:
+                    pass
             
-            if os.path.exists(results_path):
-                results_size = os.path.getsize(results_path)
-                log(f"✓ XML results exported: {results_size:,} bytes")
+            if results_file is not None:
+                results_size = os.fstat(results_file.fileno()).st_size
+                log(f"{EMO_OK}XML results exported: {results_size:,} bytes")
                 
-                # Extract and display molecular weight data
+                # Extract molecular weight data; parsing doesn't touch ASTRA,
+                # so it runs in a worker thread while the CSVs are exported
                 if SHOW_MOLECULAR_WEIGHTS_IN_TERMINAL:
-                    try:
-                        with open(results_path, 'r', encoding='utf-8') as f:
-                            xml_content = f.read()
-                        
-                        log("🔬 Extracting molecular weight data...")
-                        peak_data = extract_peak_results(xml_content)
-                        
-                        if peak_data:
-                            # Display results in terminal and save summary
-                            display_and_save_results(peak_data, run_results_folder)
-                        else:
-                            log("⚠ No molecular weight data found in XML")
-                            
-                    except Exception as extract_error:
-                        log(f"⚠ Warning: Could not extract molecular weights: {extract_error}")
+                    log(f"{EMO_MICROSCOPE}Extracting molecular weight data...")
+                    parse_future = parse_pool.submit(extract_peak_results_and_close, results_file)
+                else:
+                    results_file.close()
         
         # Step 8: Export CSV datasets
         if EXPORT_CSV_DATASETS:
@@ -443,72 +340,91 @@ def main():
             
             for dataset_name, description in DATASET_EXPORTS:
                 try:
-                    log(f"Exporting dataset: '{dataset_name}'")
+                    log(f"Exporting dataset: '{dataset_name}'", flush=True)
                     
                     csv_filename = f"chromatogram_{dataset_name.replace(' ', '_')}_{timestamp}.csv"
-                    csv_path = os.path.join(run_results_folder, csv_filename)
+                    csv_path = str(run_results_folder / csv_filename)
                     
                     success = admin.save_data_set(experiment_id, dataset_name, csv_path)
+                    csv_size = get_file_size(csv_path) if success else None
                     
-                    if success and os.path.exists(csv_path):
-                        csv_size = os.path.getsize(csv_path)
-                        log(f"  ✓ {description}: {csv_size:,} bytes")
+                    if csv_size is not None:
+                        log(f"  {EMO_OK}{description}: {csv_size:,} bytes")
                         exported_csv_count += 1
                     else:
-                        log(f"  ⚠ Failed to export '{dataset_name}'")
+                        log(f"  {EMO_WARN}Failed to export '{dataset_name}'")
                         
                 except Exception as csv_error:
-                    log(f"  ✗ Error exporting '{dataset_name}': {csv_error}")
+                    log(f"  {EMO_ERROR}Error exporting '{dataset_name}': {csv_error}")
             
-            log(f"✓ Exported {exported_csv_count} CSV dataset files")
+            log(f"{EMO_OK}Exported {exported_csv_count} CSV dataset files")
+        
+        # Display molecular weight data once the background parse is done
+        if parse_future is not None:
+            try:
+                peak_data = parse_future.result()
+                
+                if peak_data:
+                    # Display results in terminal and save summary
+                    display_and_save_results(peak_data, run_results_folder)
+                else:
+                    log(f"{EMO_WARN}No molecular weight data found in XML")
+                    
+            except Exception as extract_error:
+                log(f"{EMO_WARN}Warning: Could not extract molecular weights: {extract_error}")
         
         # Step 9: Final Summary
         log("=== Step 8: Complete! ===")
-        log("📁 All data saved to timestamped results folder:")
-        log(f"   📂 Folder: {os.path.basename(run_results_folder)}")
-        log(f"   💾 Experiment: {experiment_filename}")
+        log(f"{EMO_FOLDER}All data saved to timestamped results folder:")
+        log(f"   {EMO_OPEN_FOLDER}Folder: {run_results_folder.name}")
+        log(f"   {EMO_DISK}Experiment: {experiment_filename}")
         
         if EXPORT_XML_RESULTS:
-            log(f"   📄 XML Results: {results_filename}")
+            log(f"   {EMO_PAGE}XML Results: {results_filename}")
         if EXPORT_CSV_DATASETS:
-            log(f"   📊 CSV Datasets: {exported_csv_count} files")
+            log(f"   {EMO_CHART}CSV Datasets: {exported_csv_count} files")
         if CREATE_SUMMARY_FILE and SHOW_MOLECULAR_WEIGHTS_IN_TERMINAL:
-            log(f"   📝 Summary: molecular_weight_summary.txt")
+            log(f"   {EMO_MEMO}Summary: molecular_weight_summary.txt")
         
         # Close the experiment
         admin.close_experiment(experiment_id)
-        log("✓ Experiment closed")
+        log(f"{EMO_OK}Experiment closed")
         
         return True
         
     except Exception as main_error:
-        log(f"❌ Main automation error: {main_error}")
+        log(f"{EMO_FAIL}Main automation error: {main_error}")
         return False
     
     finally:
         # Always clean up properly
-        log("=== Cleanup ===")
+        log("=== Cleanup ===", flush=True)
+        parse_pool.shutdown()
         
         if admin is not None:
             try:
                 admin.dispose()
-                log("✓ ASTRA connection disposed")
+                log(f"{EMO_OK}ASTRA connection disposed")
             except Exception as e:
-                log(f"⚠ Warning disposing ASTRA: {e}")
+                log(f"{EMO_WARN}Warning disposing ASTRA: {e}")
 
 if __name__ == "__main__":
     success = main()
     
     if success:
-        print("\n" + "="*60)
-        print("🎉 ENHANCED GPC AUTOMATION v2 COMPLETE!")
-        print("✅ Used high-level collect_data() method")
-        print("💾 All data saved in timestamped results folder")
-        print("📊 Molecular weight analysis completed and displayed")
-        print("📁 Check the results folder for all exported files")
-        print("="*60)
+        print(
+            "\n" + "=" * 60 + "\n"
+            f"{EMO_PARTY}ENHANCED GPC AUTOMATION v2 COMPLETE!\n"
+            f"{EMO_SUCCESS}Used high-level collect_data() method\n"
+            f"{EMO_DISK}All data saved in timestamped results folder\n"
+            f"{EMO_CHART}Molecular weight analysis completed and displayed\n"
+            f"{EMO_FOLDER}Check the results folder for all exported files\n"
+            + "=" * 60
+        )
     else:
-        print("\n" + "="*60)
-        print("❌ AUTOMATION FAILED")
-        print("Check the log messages above for details")
-        print("="*60)
+        print(
+            "\n" + "=" * 60 + "\n"
+            f"{EMO_FAIL}AUTOMATION FAILED\n"
+            "Check the log messages above for details\n"
+            + "=" * 60
+        )
@@ -6,235 +6,130 @@ Extracts and displays molecular weight values from ASTRA XML results
 in the same format as shown in the ASTRA GUI.
 """
 
+import json
 import os
-import re
+import sys
 from datetime import datetime
+from astra_xml_parse import extract_peak_results, format_value_with_uncertainty
 
-def extract_peak_results(xml_content):
+# Parsed results are cached next to the XML file so re-runs on the same
+# export don't parse it again
+PEAK_CACHE_SUFFIX = ".peaks.json"
+
+def load_cached_peak_results(xml_path):
     """
-    Extract peak molecular weight results from ASTRA XML
-    Returns clean, formatted results matching ASTRA GUI display
+    Peak results saved by a previous run for this XML file, or None if
+    there is no cache or the file has changed since (the cache records
+    its mtime_ns and size).
     """
-    results = []
-    
     try:
-        lines = xml_content.split('\n')
-        
-        peak_data = {}
-        current_peak = None
-        
-        for i, line in enumerate(lines):
-            line = line.strip()
-            
-            # Look for molar mass results
-            if '<result type="molar mass">' in line:
-                if i + 1 < len(lines) and i + 2 < len(lines):
-                    name_line = lines[i + 1].strip()
-                    scalar_line = lines[i + 2].strip()
-                    
-                    # Extract name
-                    name_match = re.search(r'<name>(.+?)</name>', name_line)
-                    if name_match:
-                        name = name_match.group(1)
-                        
-                        # Extract value, units, peak number, and uncertainty
-                        # Handle different attribute orders: units, uncertainty, peak OR units, peak, uncertainty
-                        scalar_match = re.search(r'<scalar.*?units="([^"]*)".*?uncertainty="([^"]*)".*?peak="(\d+)".*?>([^<]*)</scalar>', scalar_line)
-                        
-                        if not scalar_match:
-                            # Try alternative order: units, peak, uncertainty  
-                            scalar_match = re.search(r'<scalar.*?units="([^"]*)".*?peak="(\d+)".*?uncertainty="([^"]*)".*?>([^<]*)</scalar>', scalar_line)
-                            if scalar_match:
-                                units = scalar_match.group(1)
-                                peak_num = int(scalar_match.group(2))
-                                uncertainty = float(scalar_match.group(3))
-                                value_str = scalar_match.group(4).strip()
-                        else:
-                            units = scalar_match.group(1)
-                            uncertainty = float(scalar_match.group(2))
-                            peak_num = int(scalar_match.group(3))
-                            value_str = scalar_match.group(4).strip()
-                        if scalar_match:
-                            if value_str != 'n/a':
-                                value = float(value_str)
-                                
-                                # Calculate percentage uncertainty
-                                pct_uncertainty = (uncertainty / value) * 100
-                                
-                                # Store in peak data
-                                if peak_num not in peak_data:
-                                    peak_data[peak_num] = {}
-                                
-                                peak_data[peak_num][name] = {
-                                    'value': value,
-                                    'units': units,
-                                    'uncertainty_pct': pct_uncertainty
-                                }
-            
-            # Look for polydispersity (PDI)
-            elif '<result type="polydispersity">' in line:
-                if i + 1 < len(lines) and i + 2 < len(lines):
-                    name_line = lines[i + 1].strip()
-                    if '<name>Mw/Mn</name>' in name_line:
-                        scalar_line = lines[i + 2].strip()
-                        # Handle different attribute orders for PDI
-                        scalar_match = re.search(r'<scalar.*?uncertainty="([^"]*)".*?peak="(\d+)".*?>([^<]*)</scalar>', scalar_line)
-                        
-                        if not scalar_match:
-                            scalar_match = re.search(r'<scalar.*?peak="(\d+)".*?uncertainty="([^"]*)".*?>([^<]*)</scalar>', scalar_line)
-                            if scalar_match:
-                                peak_num = int(scalar_match.group(1))
-                                uncertainty = float(scalar_match.group(2))
-                                value = float(scalar_match.group(3))
-                        else:
-                            uncertainty = float(scalar_match.group(1))
-                            peak_num = int(scalar_match.group(2))
-                            value = float(scalar_match.group(3))
-                        if scalar_match:
-                            pct_uncertainty = (uncertainty / value) * 100
-                            
-                            if peak_num not in peak_data:
-                                peak_data[peak_num] = {}
-                            
-                            peak_data[peak_num]['Mw/Mn'] = {
-                                'value': value,
-                                'units': '',
-                                'uncertainty_pct': pct_uncertainty
-                            }
-            
-            # Look for rms radius results  
-            elif '<result type="rms radius">' in line:
-                if i + 1 < len(lines) and i + 2 < len(lines):
-                    name_line = lines[i + 1].strip()
-                    scalar_line = lines[i + 2].strip()
-                    
-                    name_match = re.search(r'<name>(.+?)</name>', name_line)
-                    if name_match:
-                        name = name_match.group(1)
-                        
-                        if name == 'rz':  # Only extract rz for now
-                            # Handle different attribute orders for radius
-                            scalar_match = re.search(r'<scalar.*?units="([^"]*)".*?uncertainty="([^"]*)".*?peak="(\d+)".*?>([^<]*)</scalar>', scalar_line)
-                            
-                            if not scalar_match:
-                                scalar_match = re.search(r'<scalar.*?units="([^"]*)".*?peak="(\d+)".*?uncertainty="([^"]*)".*?>([^<]*)</scalar>', scalar_line)
-                                if scalar_match:
-                                    units = scalar_match.group(1)
-                                    peak_num = int(scalar_match.group(2))
-                                    uncertainty = float(scalar_match.group(3))
-                                    value_str = scalar_match.group(4).strip()
-                            else:
-                                units = scalar_match.group(1)
-                                uncertainty = float(scalar_match.group(2))
-                                peak_num = int(scalar_match.group(3))
-                                value_str = scalar_match.group(4).strip()
-                            if scalar_match:
-                                if value_str != 'n/a':
-                                    value = float(value_str)
-                                    pct_uncertainty = (uncertainty / value) * 100
-                                    
-                                    if peak_num not in peak_data:
-                                        peak_data[peak_num] = {}
-                                    
-                                    peak_data[peak_num]['rz'] = {
-                                        'value': value,
-                                        'units': units,
-                                        'uncertainty_pct': pct_uncertainty
-                                    }
-        
-        return peak_data
-        
-    except Exception as e:
-        print(f"Error parsing XML: {e}")
-        return {}
-
-def format_value_with_uncertainty(value, units, uncertainty_pct):
-    """Format value with uncertainty like ASTRA GUI"""
-    if value >= 1000:
-        # Format in scientific notation for large numbers
-        formatted_value = f"{value:.3e}"
-    else:
-        # Format normally for smaller numbers
-        formatted_value = f"{value:.1f}"
+        with open(xml_path + PEAK_CACHE_SUFFIX, 'r') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    st = os.stat(xml_path)
+    if cache.get("mtime_ns") != st.st_mtime_ns or cache.get("size") != st.st_size:
+        return None
     
-    return f"{formatted_value} (±{uncertainty_pct:.1f}%)"
+    # JSON keys are strings and tuples come back as lists
+    return {int(peak): {name: tuple(result) for name, result in results.items()}
+            for peak, results in cache.get("peaks", {}).items()}
+
+def save_cached_peak_results(xml_path, peak_data):
+    """Record the parsed peak results next to the XML file"""
+    st = os.stat(xml_path)
+    cache = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "peaks": peak_data}
+    with open(xml_path + PEAK_CACHE_SUFFIX, 'w') as f:
+        json.dump(cache, f, indent=2)
+
+# Fixed text of the results display, built once rather than on every call
+RESULTS_BANNER = "=" * 50
+PEAK_DIVIDER = "-" * 30
+RESULTS_TITLE = f"\n{RESULTS_BANNER}\n🎯 MOLECULAR WEIGHT ANALYSIS RESULTS\n{RESULTS_BANNER}"
+PEAK_HEADER = "\n🔬 Peak {}\n" + PEAK_DIVIDER
+MASS_HEADER = "📊 Molar mass moments (g/mol)\n"
+PDI_HEADER = "📈 Polydispersity\n"
+RADIUS_HEADER = "🔵 RMS radius moments (nm)\n"
 
 def display_peak_results(peak_data):
     """Display results in ASTRA GUI format"""
-    print("\n" + "="*50)
-    print("🎯 MOLECULAR WEIGHT ANALYSIS RESULTS")
-    print("="*50)
+    # Collect the whole report and write it to stdout in one call
+    out = [RESULTS_TITLE]
+    emit = out.append
     
     for peak_num in sorted(peak_data.keys()):
         data = peak_data[peak_num]
         
-        print(f"\n🔬 Peak {peak_num}")
-        print("-" * 30)
+        emit(PEAK_HEADER.format(peak_num))
         
         # Molar mass moments
         if any(key in data for key in ['Mn', 'Mw', 'Mp', 'Mz']):
-            print("📊 Molar mass moments (g/mol)")
-            print()
+            emit(MASS_HEADER)
             
             if 'Mn' in data:
-                mn = data['Mn']
-                formatted = format_value_with_uncertainty(mn['value'], mn['units'], mn['uncertainty_pct'])
-                print(f"  Mn: {formatted}")
+                formatted = format_value_with_uncertainty(*data['Mn'])
+                emit(f"  Mn: {formatted}")
             
             if 'Mw' in data:
-                mw = data['Mw']
-                formatted = format_value_with_uncertainty(mw['value'], mw['units'], mw['uncertainty_pct'])
-                print(f"  Mw: {formatted}")
+                formatted = format_value_with_uncertainty(*data['Mw'])
+                emit(f"  Mw: {formatted}")
                 
             if 'Mp' in data:
-                mp = data['Mp'] 
-                formatted = format_value_with_uncertainty(mp['value'], mp['units'], mp['uncertainty_pct'])
-                print(f"  Mp: {formatted}")
+                formatted = format_value_with_uncertainty(*data['Mp'])
+                emit(f"  Mp: {formatted}")
             
-            print()
+            emit("")
         
         # Polydispersity
         if 'Mw/Mn' in data:
-            print("📈 Polydispersity")
-            print()
-            pdi = data['Mw/Mn']
-            formatted = format_value_with_uncertainty(pdi['value'], '', pdi['uncertainty_pct'])
-            print(f"  Mw/Mn: {formatted}")
-            print()
+            emit(PDI_HEADER)
+            formatted = format_value_with_uncertainty(*data['Mw/Mn'])
+            emit(f"  Mw/Mn: {formatted}")
+            emit("")
         
         # RMS radius
         if 'rz' in data:
-            print("🔵 RMS radius moments (nm)")
-            print()
-            rz = data['rz']
-            formatted = format_value_with_uncertainty(rz['value'], rz['units'], rz['uncertainty_pct'])
-            print(f"  rz: {formatted}")
-            print()
+            emit(RADIUS_HEADER)
+            formatted = format_value_with_uncertainty(*data['rz'])
+            emit(f"  rz: {formatted}")
+            emit("")
+    
+    sys.stdout.write("\n".join(out) + "\n")
+    sys.stdout.flush()
 
 def main():
     """Extract and display molecular weight values from latest XML file"""
     results_dir = r"C:\Users\Administrator.WS\Desktop\wyatt-api\gpc-automation\results"
     
-    # Find the most recent XML results file
-    xml_files = [f for f in os.listdir(results_dir) if f.startswith('results_xml_') and f.endswith('.xml')]
+    # Find the most recent XML results file; scandir entries carry their
+    # own cached stat, so no extra path joins or stat calls per file
+    with os.scandir(results_dir) as entries:
+        latest = max(
+            (entry for entry in entries if entry.name.startswith('results_xml_') and entry.name.endswith('.xml')),
+            key=lambda entry: entry.stat().st_mtime,
+            default=None
+        )
     
-    if not xml_files:
+    if latest is None:
         print("❌ No XML results files found!")
         print(f"📁 Looking in: {results_dir}")
         return
     
-    # Get the most recent file
-    latest_file = max(xml_files, key=lambda f: os.path.getmtime(os.path.join(results_dir, f)))
-    xml_path = os.path.join(results_dir, latest_file)
+    xml_path = latest.path
     
-    print(f"📄 Reading results from: {latest_file}")
+    print(f"📄 Reading results from: {latest.name}")
     
     try:
-        with open(xml_path, 'r', encoding='utf-8') as f:
-            xml_content = f.read()
-        
-        # Extract the results
-        peak_data = extract_peak_results(xml_content)
+        # Extract the results, unless this file was already parsed
+        peak_data = load_cached_peak_results(xml_path)
+        if peak_data is None:
+            peak_data = extract_peak_results(xml_path)
+            if peak_data:
+                try:
+                    save_cached_peak_results(xml_path, peak_data)
+                except OSError as e:
+                    print(f"⚠ Could not cache parsed results: {e}")
         
         if peak_data:
             display_peak_results(peak_data)
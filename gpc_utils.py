@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Shared Helpers for the GPC Automation Scripts
+
+Small utilities used by several of the dataset/export scripts so
+they don't each carry their own copy.
+"""
+
+import atexit
+import inspect
+import json
+import os
+import re
+import sys
+import time
+from io import StringIO
+from itertools import islice
+
+# Block-buffer stdout instead of flushing every log line; whatever is
+# still buffered is written out when the script exits.
+if hasattr(sys.stdout, "reconfigure"):
+    sys.stdout.reconfigure(line_buffering=False)
+atexit.register(sys.stdout.flush)
+
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9]')
+
+DATASET_CACHE_NAME = ".dataset_cache.json"
+
+# log() timestamps only have one-second resolution, so the formatted
+# string is reused until the second changes
+_log_second = None
+_log_timestamp = ""
+
+def _timestamp():
+    global _log_second, _log_timestamp
+    now = int(time.time())
+    if now != _log_second:
+        _log_second = now
+        _log_timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now))
+    return _log_timestamp
+
+def log(message: str, flush: bool = False):
+    """
+    Log with timestamp.
+
+    Output is buffered, so pass flush=True before a call that blocks
+    on ASTRA to make sure the message is on screen while waiting.
+    """
+    sys.stdout.write(f"[{_timestamp()}] {message}\n")
+    if flush:
+        sys.stdout.flush()
+
+def log_lines(lines, flush: bool = False):
+    """
+    Log a block of lines, such as a closing summary, under one
+    timestamp with a single write.
+    """
+    prefix = f"[{_timestamp()}] "
+    sys.stdout.write("".join(f"{prefix}{line}\n" for line in lines))
+    if flush:
+        sys.stdout.flush()
+
+def get_file_size(path):
+    """
+    Size of a file in bytes, or None if it doesn't exist.
+    One os.stat call instead of os.path.exists + os.path.getsize.
+    """
+    try:
+        return os.stat(path).st_size
+    except FileNotFoundError:
+        return None
+
+def list_dataset_names(admin, experiment_id):
+    """
+    Get the dataset definition names ASTRA reports for an experiment.
+
+    GetDataSetNames is missing from the Python wrapper, so the COM call
+    goes through admin.try_get to run under the wrapper's lock and error
+    handling like every other call. Raises if the call is not available.
+    """
+    dataset_names = admin.try_get(lambda: admin.astra_com.GetDataSetNames(experiment_id))
+    # try_get hands back an inspect._empty instance when the call fails
+    if dataset_names is None or isinstance(dataset_names, inspect.Parameter.empty):
+        raise RuntimeError("GetDataSetNames returned no result")
+    return list(dataset_names)
+
+def normalize_dataset_name(name):
+    """Lower-case a dataset name and strip spaces, dots, separators etc."""
+    return _NON_ALNUM_RE.sub('', name.lower())
+
+def dedupe_dataset_names(names):
+    """
+    Drop guessed names that only differ by case or separators, keeping
+    the first spelling, so each variant costs one GetDataSet call.
+    """
+    unique = {}
+    for name in names:
+        unique.setdefault(normalize_dataset_name(name), name)
+    return list(unique.values())
+
+def match_dataset_names(candidates, dataset_names):
+    """
+    Map guessed dataset definitions onto the names ASTRA reports.
+
+    Candidates are compared after normalize_dataset_name(), so case and
+    separator variants of the same name collapse onto one real name.
+    Returns the matching ASTRA names in candidate order, without repeats.
+    """
+    canonical = {normalize_dataset_name(name): name for name in dataset_names}
+    matched = {}
+    for candidate in candidates:
+        name = canonical.get(normalize_dataset_name(candidate))
+        if name is not None:
+            matched[name] = None
+    return list(matched)
+
+def first_lines(content, count, chunk=4096):
+    """
+    First `count` lines of a dataset string, without trailing newlines.
+    Only the first `chunk` characters are looked at, so a multi-MB
+    dataset isn't split up just to show a preview.
+    """
+    return [line.rstrip('\n') for line in islice(StringIO(content[:chunk]), count)]
+
+def filename_table(keep, to_underscore=""):
+    """
+    str.translate table for turning a dataset definition into part of a
+    file name: characters in `to_underscore` become "_", ASCII letters,
+    digits and `keep` are left alone, and every other character is dropped.
+    """
+    table = {i: None for i in range(128) if not (chr(i).isalnum() or chr(i) in keep)}
+    table.update({ord(c): "_" for c in to_underscore})
+    return table
+
+def sanitize_filename(name, table):
+    """Apply a filename_table() in one pass, dropping non-ASCII characters first."""
+    return name.encode("ascii", "ignore").decode("ascii").translate(table)
+
+def _read_dataset_cache(cache_path):
+    try:
+        with open(cache_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def load_cached_definitions(results_dir, experiment_file, script):
+    """
+    Working dataset definitions the given script found on a previous run
+    against this experiment file, or None if there is no entry, the entry
+    is empty, or the file has been modified since (the entry is keyed on
+    its mtime_ns).
+    """
+    cache = _read_dataset_cache(os.path.join(results_dir, DATASET_CACHE_NAME))
+    entry = cache.get(script, {}).get(str(experiment_file))
+    if entry is None or entry.get("mtime_ns") != os.stat(experiment_file).st_mtime_ns:
+        return None
+    return entry.get("definitions") or None
+
+def save_cached_definitions(results_dir, experiment_file, script, definitions):
+    """
+    Record the working dataset definitions a script found for an
+    experiment file. Each script has its own entries, since they probe
+    different definitions. An empty list removes the entry instead, so
+    the next run discovers the datasets again.
+    """
+    cache_path = os.path.join(results_dir, DATASET_CACHE_NAME)
+    cache = _read_dataset_cache(cache_path)
+    entries = cache.setdefault(script, {})
+    if definitions:
+        entries[str(experiment_file)] = {
+            "mtime_ns": os.stat(experiment_file).st_mtime_ns,
+            "definitions": list(definitions),
+        }
+    elif entries.pop(str(experiment_file), None) is None:
+        return
+    with open(cache_path, 'w') as f:
+        json.dump(cache, f, indent=2)
@@ -12,10 +12,13 @@ Use this on experiment files created by your data collection script.
 """
 
 import os
+import sys
 import uuid
-import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from astra_admin import AstraAdmin
+from astra_xml_parse import extract_peak_results, format_value_with_uncertainty
+from gpc_utils import log
 
 # =============================================================================
 # CONFIGURATION PARAMETERS
@@ -37,165 +40,55 @@ MW_DECIMAL_PLACES = 1   # Standard precision for molecular weights
 
 # =============================================================================
 
-def log(message: str):
-    """Log with timestamp"""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    print(f"[{timestamp}] {message}")
-
-def extract_peak_results(xml_content):
-    """Extract peak molecular weight results from ASTRA XML"""
-    try:
-        lines = xml_content.split('\n')
-        peak_data = {}
-        
-        for i, line in enumerate(lines):
-            line = line.strip()
-            
-            # Look for molar mass results
-            if '<result type="molar mass">' in line:
-                if i + 1 < len(lines) and i + 2 < len(lines):
-                    name_line = lines[i + 1].strip()
-                    scalar_line = lines[i + 2].strip()
-                    
-                    # Extract name
-                    name_match = re.search(r'<name>(.+?)</name>', name_line)
-                    if name_match:
-                        name = name_match.group(1)
-                        
-                        # Handle different XML attribute orders
-                        scalar_match = re.search(r'<scalar.*?units="([^"]*)".*?uncertainty="([^"]*)".*?peak="(\d+)".*?>([^<]*)</scalar>', scalar_line)
-                        
-                        if not scalar_match:
-                            scalar_match = re.search(r'<scalar.*?units="([^"]*)".*?peak="(\d+)".*?uncertainty="([^"]*)".*?>([^<]*)</scalar>', scalar_line)
-                            if scalar_match:
-                                units = scalar_match.group(1)
-                                peak_num = int(scalar_match.group(2))
-                                uncertainty = float(scalar_match.group(3))
-                                value_str = scalar_match.group(4).strip()
-                        else:
-                            units = scalar_match.group(1)
-                            uncertainty = float(scalar_match.group(2))
-                            peak_num = int(scalar_match.group(3))
-                            value_str = scalar_match.group(4).strip()
-                        
-                        if scalar_match and value_str != 'n/a' and value_str != '~Invalid':
-                            value = float(value_str)
-                            pct_uncertainty = (uncertainty / value) * 100
-                            
-                            if peak_num not in peak_data:
-                                peak_data[peak_num] = {}
-                            
-                            peak_data[peak_num][name] = {
-                                'value': value,
-                                'units': units,
-                                'uncertainty_pct': pct_uncertainty
-                            }
-            
-            # Look for polydispersity (PDI)
-            elif '<result type="polydispersity">' in line:
-                if i + 1 < len(lines) and i + 2 < len(lines):
-                    name_line = lines[i + 1].strip()
-                    if '<name>Mw/Mn</name>' in name_line:
-                        scalar_line = lines[i + 2].strip()
-                        scalar_match = re.search(r'<scalar.*?uncertainty="([^"]*)".*?peak="(\d+)".*?>([^<]*)</scalar>', scalar_line)
-                        
-                        if not scalar_match:
-                            scalar_match = re.search(r'<scalar.*?peak="(\d+)".*?uncertainty="([^"]*)".*?>([^<]*)</scalar>', scalar_line)
-                            if scalar_match:
-                                peak_num = int(scalar_match.group(1))
-                                uncertainty = float(scalar_match.group(2))
-                                value_str = scalar_match.group(3).strip()
-                        else:
-                            uncertainty = float(scalar_match.group(1))
-                            peak_num = int(scalar_match.group(2))
-                            value_str = scalar_match.group(3).strip()
-                        
-                        if scalar_match and value_str != 'n/a' and value_str != '~Invalid':
-                            value = float(value_str)
-                            pct_uncertainty = (uncertainty / value) * 100
-                            
-                            if peak_num not in peak_data:
-                                peak_data[peak_num] = {}
-                            
-                            peak_data[peak_num]['Mw/Mn'] = {
-                                'value': value,
-                                'units': '',
-                                'uncertainty_pct': pct_uncertainty
-                            }
-        
-        return peak_data
-        
-    except Exception as e:
-        log(f"Error parsing XML: {e}")
-        return {}
-
-def format_value_with_uncertainty(value, units, uncertainty_pct, extra_precision=False):
-    """Format value with uncertainty like ASTRA GUI"""
-    if value >= 1000:
-        formatted_value = f"{value:.3e}"
-    else:
-        formatted_value = f"{value:.1f}"
-    
-    # Use configurable precision
-    precision = f".{PDI_DECIMAL_PLACES}f" if extra_precision else f".{MW_DECIMAL_PLACES}f"
-    return f"{formatted_value} (±{uncertainty_pct:{precision}}%)"
+# Fixed text of the results display, built once rather than on every call
+RESULTS_BANNER = "=" * 50
+PEAK_DIVIDER = "-" * 30
+RESULTS_TITLE = f"\n{RESULTS_BANNER}\n🎯 MOLECULAR WEIGHT ANALYSIS RESULTS\n{RESULTS_BANNER}"
+PEAK_HEADER = "\n🔬 Peak {}\n" + PEAK_DIVIDER
+MASS_HEADER = "📊 Molar mass moments (g/mol)\n"
+PDI_HEADER = "📈 Polydispersity\n"
+RESULTS_FOOTER = f"{RESULTS_BANNER}\n✅ SUCCESS: Molecular weight analysis complete!\n{RESULTS_BANNER}"
 
 def display_results(peak_data):
     """Display results in terminal"""
-    print("\n" + "="*50)
-    print("🎯 MOLECULAR WEIGHT ANALYSIS RESULTS")
-    print("="*50)
+    # Collect the whole report and write it to stdout in one call
+    out = [RESULTS_TITLE]
+    emit = out.append
     
     for peak_num in sorted(peak_data.keys()):
         data = peak_data[peak_num]
         
-        peak_header = f"🔬 Peak {peak_num}"
-        peak_divider = "-" * 30
-        
-        print(f"\n{peak_header}")
-        print(peak_divider)
+        emit(PEAK_HEADER.format(peak_num))
         
         # Molar mass moments
         if any(key in data for key in ['Mn', 'Mw', 'Mp', 'Mz']):
-            mass_header = "📊 Molar mass moments (g/mol)"
-            print(mass_header)
-            print()
+            emit(MASS_HEADER)
             
             if 'Mn' in data:
-                mn = data['Mn']
-                formatted = format_value_with_uncertainty(mn['value'], mn['units'], mn['uncertainty_pct'])
-                line = f"  Mn: {formatted}"
-                print(line)
+                formatted = format_value_with_uncertainty(*data['Mn'], uncertainty_places=MW_DECIMAL_PLACES)
+                emit(f"  Mn: {formatted}")
             
             if 'Mw' in data:
-                mw = data['Mw']
-                formatted = format_value_with_uncertainty(mw['value'], mw['units'], mw['uncertainty_pct'])
-                line = f"  Mw: {formatted}"
-                print(line)
+                formatted = format_value_with_uncertainty(*data['Mw'], uncertainty_places=MW_DECIMAL_PLACES)
+                emit(f"  Mw: {formatted}")
                 
             if 'Mp' in data:
-                mp = data['Mp'] 
-                formatted = format_value_with_uncertainty(mp['value'], mp['units'], mp['uncertainty_pct'])
-                line = f"  Mp: {formatted}"
-                print(line)
+                formatted = format_value_with_uncertainty(*data['Mp'], uncertainty_places=MW_DECIMAL_PLACES)
+                emit(f"  Mp: {formatted}")
             
-            print()
+            emit("")
         
         # Polydispersity with extra precision
         if 'Mw/Mn' in data:
-            pdi_header = "📈 Polydispersity"
-            print(pdi_header)
-            print()
+            emit(PDI_HEADER)
             
-            pdi = data['Mw/Mn']
-            formatted = format_value_with_uncertainty(pdi['value'], '', pdi['uncertainty_pct'], extra_precision=True)
-            line = f"  Mw/Mn: {formatted}"
-            print(line)
-            print()
+            formatted = format_value_with_uncertainty(*data['Mw/Mn'], uncertainty_places=PDI_DECIMAL_PLACES)
+            emit(f"  Mw/Mn: {formatted}")
+            emit("")
     
-    print("="*50)
-    print("✅ SUCCESS: Molecular weight analysis complete!")
-    print("="*50)
+    emit(RESULTS_FOOTER)
+    sys.stdout.write("\n".join(out) + "\n")
+    sys.stdout.flush()
 
 def main():
     """Simple experiment processor - exactly like official process_experiment()"""
@@ -216,10 +109,12 @@ def main():
     
     admin = None
     experiment_id = None
+    parse_pool = ThreadPoolExecutor(max_workers=1)
+    parse_future = None
     
     try:
         # Step 1: Set automation identity
-        log("=== Step 1: Setting Automation Identity ===")
+        log("=== Step 1: Setting Automation Identity ===", flush=True)
         client_id = uuid.uuid4().hex
         
         admin = AstraAdmin()
@@ -233,23 +128,23 @@ def main():
         log("✓ Automation identity set")
         
         # Step 2: Wait for instruments
-        log("=== Step 2: Waiting for Instruments ===")
+        log("=== Step 2: Waiting for Instruments ===", flush=True)
         admin.wait_for_instruments()
         log("✓ Instruments detected")
         
         # Step 3: Open experiment (exactly like official example)
-        log("=== Step 3: Opening Experiment ===")
+        log("=== Step 3: Opening Experiment ===", flush=True)
         experiment_id = admin.open_experiment(experiment_path)
         log(f"✓ Experiment opened - ID: {experiment_id}")
         
         # Step 4: Run experiment (exactly like official example)
         log("=== Step 4: Running Experiment ===")
-        log("Processing data and calculating molecular weights...")
+        log("Processing data and calculating molecular weights...", flush=True)
         admin.run_experiment(experiment_id)
         log("✓ Experiment run completed")
         
         # Step 5: Save XML results
-        log("=== Step 5: Saving Results ===")
+        log("=== Step 5: Saving Results ===", flush=True)
         results_filename = f"{base_name}_results_{timestamp}.xml"
         results_path = os.path.join(output_dir, results_filename)
         
@@ -259,22 +154,21 @@ def main():
             results_size = os.path.getsize(results_path)
             log(f"✓ XML results saved: {results_filename} ({results_size:,} bytes)")
             
-            # Extract and display molecular weight data
+            # Extract molecular weight data; parsing doesn't touch ASTRA,
+            # so it runs in a worker thread while the CSVs are exported
             if SHOW_MOLECULAR_WEIGHTS_IN_TERMINAL:
+                # With the experiment's peak count the parse can stop as soon
+                # as every peak is complete; the count is read here because
+                # ASTRA calls stay on the main thread
                 try:
-                    with open(results_path, 'r', encoding='utf-8') as f:
-                        xml_content = f.read()
-                    
-                    log("🔬 Extracting molecular weight data...")
-                    peak_data = extract_peak_results(xml_content)
-                    
-                    if peak_data:
-                        display_results(peak_data)
-                    else:
-                        log("⚠ No molecular weight data found in XML")
-                        
-                except Exception as extract_error:
-                    log(f"⚠ Warning: Could not extract molecular weights: {extract_error}")
+                    expected_peaks = len(admin.get_peak_ranges(experiment_id))
+                except TypeError:
+                    # A failed call comes back from try_get() as an
+                    # inspect._empty instance, which has no length
+                    expected_peaks = None
+                
+                log("🔬 Extracting molecular weight data...")
+                parse_future = parse_pool.submit(extract_peak_results, results_path, expected_peaks)
         else:
             log("❌ Error: Results file was not created")
             return False
@@ -285,7 +179,7 @@ def main():
         
         for dataset_name, description in DATASET_EXPORTS:
             try:
-                log(f"Exporting dataset: '{dataset_name}'")
+                log(f"Exporting dataset: '{dataset_name}'", flush=True)
                 
                 csv_filename = f"{base_name}_{dataset_name.replace(' ', '_')}_{timestamp}.csv"
                 csv_path = os.path.join(output_dir, csv_filename)
@@ -304,6 +198,19 @@ def main():
         
         log(f"✓ Exported {exported_csv_count} CSV dataset files")
         
+        # Display molecular weight data once the background parse is done
+        if parse_future is not None:
+            try:
+                peak_data = parse_future.result()
+                
+                if peak_data:
+                    display_results(peak_data)
+                else:
+                    log("⚠ No molecular weight data found in XML")
+                    
+            except Exception as extract_error:
+                log(f"⚠ Warning: Could not extract molecular weights: {extract_error}")
+        
         # Step 7: Summary
         log("=== Step 7: Complete! ===")
         log(f"📁 Output directory: {output_dir}")
@@ -318,7 +225,8 @@ def main():
     
     finally:
         # Always clean up properly
-        log("=== Cleanup ===")
+        log("=== Cleanup ===", flush=True)
+        parse_pool.shutdown()
         
         if experiment_id is not None and admin is not None:
             try:
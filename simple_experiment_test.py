@@ -8,14 +8,15 @@ using their intended event-driven workflow.
 """
 
 import os
+import sys
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
+from comtypes import COMError
 from astra_admin import AstraAdmin
-
-def log(message: str):
-    """Log with timestamp"""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    print(f"[{timestamp}] {message}")
+from astra_xml_parse import extract_peak_results, format_value_with_uncertainty
+from gpc_utils import get_file_size, list_dataset_names, log, log_lines, normalize_dataset_name
 
 def main():
     """
@@ -26,10 +27,12 @@ def main():
     log("Following Wyatt's exact pattern for full data collection workflow")
     
     # Step 1: Set automation identity (exactly like Wyatt does)
-    log("=== Step 1: Setting Automation Identity ===")
+    log("=== Step 1: Setting Automation Identity ===", flush=True)
     client_id = uuid.uuid4().hex
     
-    AstraAdmin().set_automation_identity(
+    # AstraAdmin is a singleton; bind it once and reuse it for every call
+    admin = AstraAdmin()
+    admin.set_automation_identity(
         "Simple Test App", 
         "1.0.0.0",
         os.getpid(),
@@ -43,10 +46,10 @@ def main():
     log("About to call AstraAdmin().wait_for_instruments()...")
     log("  → This waits for InstrumentDetectionCompleted event (REQUIRED)")
     log("  → If this hangs, the event system has issues")
-    log("  → Starting wait now...")
+    log("  → Starting wait now...", flush=True)
     
     try:
-        AstraAdmin().wait_for_instruments()
+        admin.wait_for_instruments()
         log("✓ Instruments detected - event system working!")
     except Exception as e:
         log(f"✗ Error waiting for instruments: {e}")
@@ -60,16 +63,16 @@ def main():
     log("About to call AstraAdmin().new_experiment_from_template()...")
     log("  → This waits for ExperimentRead and ExperimentRun events")
     log("  → If this hangs, wrapper event handling has issues")
-    log("  → Starting experiment creation now...")
+    log("  → Starting experiment creation now...", flush=True)
     
     try:
-        experiment_id = AstraAdmin().new_experiment_from_template(method_path)
+        experiment_id = admin.new_experiment_from_template(method_path)
         log(f"✓ Experiment created successfully - ID: {experiment_id}")
         log("✓ Wrapper event system working properly!")
         
         # Get experiment name to confirm it's working
         try:
-            exp_name = AstraAdmin().get_experiment_name(experiment_id)
+            exp_name = admin.get_experiment_name(experiment_id)
             log(f"✓ Experiment name: {exp_name}")
         except Exception as e:
             log(f"⚠ Could not get experiment name: {e}")
@@ -77,10 +80,10 @@ def main():
         
         # Step 4: Setup results directory
         log("=== Step 4: Setting up Results Directory ===")
-        results_dir = os.path.join(r"C:\Users\Administrator.WS\Desktop\wyatt-api\gpc-automation", "results")
+        results_dir = Path(r"C:\Users\Administrator.WS\Desktop\wyatt-api\gpc-automation") / "results"
         
         # Create results directory if it doesn't exist
-        os.makedirs(results_dir, exist_ok=True)
+        results_dir.mkdir(parents=True, exist_ok=True)
         log(f"✓ Results directory ready: {results_dir}")
         log("✓ Skipping early save - will save complete experiment after data collection")
         
@@ -89,10 +92,10 @@ def main():
         log("About to call AstraAdmin().start_collection()...")
         log("  → This begins the GPC data collection workflow")
         log("  → Follows Wyatt's trusted event-driven pattern")
-        log("  → Starting collection now...")
+        log("  → Starting collection now...", flush=True)
         
         try:
-            collection_success = AstraAdmin().start_collection(experiment_id)
+            collection_success = admin.start_collection(experiment_id)
             if collection_success:
                 log("✓ Collection started successfully!")
                 log("✓ ASTRA is now preparing for data collection")
@@ -109,10 +112,10 @@ def main():
         log("  → This waits for the GPC system to signal it's ready")
         log("  → This is exactly what you need for GPC automation!")
         log("  → ASTRA will wait here until GPC sends inject signal")
-        log("  → Starting wait for GPC signal now...")
+        log("  → Starting wait for GPC signal now...", flush=True)
         
         try:
-            AstraAdmin().wait_waiting_for_auto_inject()
+            admin.wait_waiting_for_auto_inject()
             log("✓ GPC auto-inject signal received!")
             log("✓ GPC system has triggered the injection")
             log("✓ Data collection workflow proceeding...")
@@ -126,10 +129,10 @@ def main():
         log("About to call AstraAdmin().wait_collection_started()...")
         log("  → This waits for data acquisition to begin")
         log("  → After GPC injection, ASTRA starts recording data")
-        log("  → Starting wait for data collection now...")
+        log("  → Starting wait for data collection now...", flush=True)
         
         try:
-            AstraAdmin().wait_collection_started()
+            admin.wait_collection_started()
             log("✓ Data collection started!")
             log("✓ ASTRA is now actively collecting data from detectors")
             log("✓ GPC sample is flowing through the system")
@@ -143,11 +146,11 @@ def main():
         log("  → This waits for the GPC run to complete")
         log("  → Collection time depends on your method settings")
         log("  → ASTRA will automatically stop when method duration reached")
-        log("  → Waiting for collection completion...")
+        log("  → Waiting for collection completion...", flush=True)
         
         collection_start_time = datetime.now()
         try:
-            AstraAdmin().wait_collection_finished()
+            admin.wait_collection_finished()
             collection_end_time = datetime.now()
             collection_duration = (collection_end_time - collection_start_time).total_seconds() / 60
             log("✓ Data collection completed!")
@@ -162,10 +165,10 @@ def main():
         log("About to call AstraAdmin().wait_experiment_run()...")
         log("  → This waits for ASTRA to process the collected data")
         log("  → ASTRA calculates results, baselines, peaks, etc.")
-        log("  → Starting data processing wait...")
+        log("  → Starting data processing wait...", flush=True)
         
         try:
-            AstraAdmin().wait_experiment_run()
+            admin.wait_experiment_run()
             log("✓ Data processing completed!")
             log("✓ ASTRA has calculated all results from collected data")
             log("✓ Experiment is ready for data export")
@@ -175,24 +178,25 @@ def main():
         
         # Step 10: Save Final Experiment with Data
         log("=== Step 10: Saving Final Experiment with Data ===")
-        final_timestamp_str = datetime.now().strftime('%Y%m%d_%H%M%S')
-        final_filename = f"collected_experiment_{final_timestamp_str}.aex"
-        final_save_path = os.path.join(results_dir, final_filename)
+        # One timestamp names the experiment and every export from this run
+        run_timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        final_filename = f"collected_experiment_{run_timestamp}.aex"
+        final_save_path = str(results_dir / final_filename)
         
         log(f"Saving collected data to: {final_save_path}")
         log("About to call AstraAdmin().save_experiment() with collected data...")
         log("  → This saves the complete experiment with GPC data")
-        log("  → File will contain all chromatograms, results, and analysis")
+        log("  → File will contain all chromatograms, results, and analysis", flush=True)
         
         try:
-            final_save_success = AstraAdmin().save_experiment(experiment_id, final_save_path)
+            final_save_success = admin.save_experiment(experiment_id, final_save_path)
             if final_save_success:
                 log("✓ Final experiment with data saved successfully!")
                 log(f"✓ File: {final_filename}")
                 
                 # Verify final file
-                if os.path.exists(final_save_path):
-                    final_file_size = os.path.getsize(final_save_path)
+                final_file_size = get_file_size(final_save_path)
+                if final_file_size is not None:
                     log(f"✓ Final file verified: {final_file_size:,} bytes")
                     log("✓ PROOF: Complete GPC automation worked - data collected!")
                 else:
@@ -206,163 +210,190 @@ def main():
         
         # Step 11: Export Results and Data
         log("=== Step 11: Exporting Results and Data ===")
-        results_timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        
         # Export results (XML format)
-        results_filename = f"results_{results_timestamp}.xml"
-        results_path = os.path.join(results_dir, results_filename)
+        results_filename = f"results_{run_timestamp}.xml"
+        results_path = str(results_dir / results_filename)
         
         log(f"Exporting results to: {results_path}")
         log("About to call AstraAdmin().save_results()...")
-        log("  → This exports calculated results in XML format")
+        log("  → This exports calculated results in XML format", flush=True)
+        
+        # Parsing the XML doesn't touch ASTRA, so it runs in a worker thread
+        # while the datasets below are exported
+        parse_pool = ThreadPoolExecutor(max_workers=1)
+        parse_future = None
         
         try:
-            AstraAdmin().save_results(experiment_id, results_path)
-            if os.path.exists(results_path):
-                results_size = os.path.getsize(results_path)
-                log(f"✓ Results exported successfully: {results_size:,} bytes")
-                log(f"✓ Results file: {results_filename}")
-                
-                # Try to extract molecular weight data from XML results
-                try:
-                    with open(results_path, 'r', encoding='utf-8') as f:
-                        xml_content = f.read()
+            try:
+                admin.save_results(experiment_id, results_path)
+                results_size = get_file_size(results_path)
+                if results_size is not None:
+                    log(f"✓ Results exported successfully: {results_size:,} bytes")
+                    log(f"✓ Results file: {results_filename}")
                     
+                    # Stream the <result> elements instead of scanning the text
                     log("🔬 Scanning results for molecular weight data...")
+                    parse_future = parse_pool.submit(extract_peak_results, results_path)
+                else:
+                    log("⚠ Results export may have failed - file not found")
+            except Exception as e:
+                log(f"⚠ Warning - results export error: {e}")
+            
+            # Export data set (CSV format) - Use confirmed working dataset definitions from ASTRA GUI
+            log(f"Attempting to retrieve dataset content...")
+            log("About to call AstraAdmin().get_data_set()...")
+            log("  → Using confirmed dataset definitions from ASTRA GUI", flush=True)
+            
+            # Test both confirmed working dataset definitions from ASTRA GUI  
+            real_dataset_definitions = [
+                ("masses vs volume", "Molecular weight data"),           # The molecular weight data!
+                ("rms radius vs volume", "Light scattering data")       # Light scattering data
+            ]
+            
+            # One GetDataSetNames call tells which definitions this experiment has,
+            # so missing ones are skipped instead of each costing a failed GetDataSet
+            try:
+                available_names = {normalize_dataset_name(name): name
+                                   for name in list_dataset_names(admin, experiment_id)}
+                log(f"  → GetDataSetNames reported {len(available_names)} dataset definitions")
+            except (AttributeError, COMError, RuntimeError) as e:
+                log(f"  → GetDataSetNames unavailable ({e}) - probing each definition")
+                available_names = None
+            
+            # Output file name and path for each dataset, built before the export loop
+            dataset_exports = []
+            for definition_name, description in real_dataset_definitions:
+                if available_names is not None:
+                    astra_name = available_names.get(normalize_dataset_name(definition_name))
+                    if astra_name is None:
+                        log(f"  → '{definition_name}' - not present in this experiment")
+                        continue
+                    # Use ASTRA's own spelling of the name
+                    definition_name = astra_name
+                data_filename = f"{definition_name.replace(' ', '_')}_{run_timestamp}.csv"
+                dataset_exports.append((definition_name, description, data_filename, str(results_dir / data_filename)))
+            
+            dataset_exported = False
+            exported_datasets = []
+            
+            for definition_name, description, data_filename, data_path in dataset_exports:
+                try:
+                    log(f"  → Testing dataset: '{definition_name}' ({description})", flush=True)
+                    dataset_content = admin.get_data_set(experiment_id, definition_name)
+                    
+                    # A failed GetDataSet comes back from try_get() as an
+                    # inspect._empty instance rather than a string
+                    if not isinstance(dataset_content, str):
+                        log(f"  → '{definition_name}' - empty dataset")
+                    elif len(dataset_content) > 10 and not dataset_content.isspace():
+                        content_length = len(dataset_content)
+                        lines = dataset_content.count('\n') + 1
+                        log(f"  ✓ Found data for '{definition_name}': {content_length} chars, {lines} lines")
+                        
+                        # Export this dataset
+                        log(f"    Exporting to: {data_filename}", flush=True)
+                        
+                        try:
+                            success = admin.save_data_set(experiment_id, definition_name, data_path)
+                            data_size = get_file_size(data_path) if success else None
+                            if data_size is not None:
+                                log(f"    ✓ Dataset exported successfully: {data_size:,} bytes")
+                                log(f"    ✓ Dataset type: {description}")
+                                exported_datasets.append((definition_name, data_filename, description))
+                                dataset_exported = True
+                                
+                                if "masses" in definition_name.lower():
+                                    log("    🔬 This file contains your molecular weight data!")
+                                    log("    📊 Look for 'Molar Mass (g/mol)' section in the CSV file")
+                            else:
+                                log(f"    ✗ Export failed or file not created")
+                        except (COMError, OSError) as e:
+                            log(f"    ✗ Export error: {e}")
+                    else:
+                        log(f"  → '{definition_name}' - no data or empty result")
+                        
+                except COMError as e:
+                    # Only raised when AstraAdmin.should_show_error_message_box is off
+                    log(f"  → '{definition_name}' - error: {e}")
+            
+            # Report the molecular weight data once the background parse is done
+            if parse_future is not None:
+                try:
+                    peak_data = parse_future.result()
                     
-                    # Look for common molecular weight indicators in the XML
-                    if "Mn" in xml_content and "Mw" in xml_content:
+                    if any('Mn' in results and 'Mw' in results for results in peak_data.values()):
                         log("✓ Found Mn/Mw data in results!")
                         
-                        # Extract lines containing molecular weight info
-                        for line in xml_content.split('\n'):
-                            if any(keyword in line.lower() for keyword in ['mn', 'mw', 'molecular', 'weight', 'molar']):
-                                if '=' in line or '>' in line:
-                                    log(f"  → {line.strip()}")
+                        # Show every molecular weight result that was found
+                        for peak_num in sorted(peak_data):
+                            for name, (value, units, uncertainty_pct) in peak_data[peak_num].items():
+                                label = f"{name} ({units})" if units else name
+                                formatted = format_value_with_uncertainty(value, units, uncertainty_pct)
+                                log(f"  → Peak {peak_num} {label}: {formatted}")
                     else:
                         log("⚠ No Mn/Mw data found in XML - may need different export format")
                         
                 except Exception as read_error:
                     log(f"⚠ Could not analyze results file: {read_error}")
-                    
+            
+            if not dataset_exported:
+                log("⚠ Warning - no datasets were exported")
+                log("💡 This suggests the experiment may not have been processed properly")
             else:
-                log("⚠ Results export may have failed - file not found")
-        except Exception as e:
-            log(f"⚠ Warning - results export error: {e}")
-        
-        # Export data set (CSV format) - Use confirmed working dataset definitions from ASTRA GUI
-        log(f"Attempting to retrieve dataset content...")
-        log("About to call AstraAdmin().get_data_set()...")
-        log("  → Using confirmed dataset definitions from ASTRA GUI")
-        
-        # Test both confirmed working dataset definitions from ASTRA GUI  
-        real_dataset_definitions = [
-            ("masses vs volume", "Molecular weight data"),           # The molecular weight data!
-            ("rms radius vs volume", "Light scattering data")       # Light scattering data
-        ]
-        
-        dataset_exported = False
-        exported_datasets = []
-        
-        for definition_name, description in real_dataset_definitions:
+                log("✅ Dataset export summary:")
+                for def_name, filename, desc in exported_datasets:
+                    log(f"  → {filename} ({desc})")
+                log("🎯 CSV export problem SOLVED - using real ASTRA dataset definition names!")
+            
+            # Final completion summary
+            summary = [
+                "=== COMPLETE SUCCESS ===",
+                "✓ Full GPC automation workflow completed successfully!",
+                "✓ Experiment created from method template",
+                "✓ GPC auto-inject signal received and processed",
+                "✓ Data collection completed",
+                "✓ Results calculated and processed",
+                "✓ All files saved to disk as permanent proof",
+                "",
+                "Generated files in results folder:",
+                f"  → Complete experiment: {final_filename}",
+                f"  → Results (XML): {results_filename}",
+            ]
+            if dataset_exported:
+                for def_name, filename, desc in exported_datasets:
+                    summary.append(f"  → Dataset CSV: {filename} ({desc})")
+            else:
+                summary.append("  → Dataset CSV: FAILED TO EXPORT")
+            summary += [
+                "",
+                "🎉 Complete GPC automation with molecular weight data export!",
+                "📊 Check the 'masses vs volume' CSV for molecular weight values",
+                "🎉 Your GPC automation pipeline is working perfectly!",
+            ]
+            log_lines(summary)
+            
+        finally:
+            # Runs even if an export step raises, so the parse worker exits
+            # and the experiment isn't left open in ASTRA
+            parse_pool.shutdown()
+            
+            # Step 12: Close Experiment (following Wyatt's pattern)
+            log("=== Step 12: Closing Experiment ===")
+            log("About to call AstraAdmin().close_experiment()...")
+            log("  → This properly closes the experiment in ASTRA")
+            log("  → Follows Wyatt's cleanup pattern")
+            log("  → Prepares for clean disposal", flush=True)
+            
             try:
-                log(f"  → Testing dataset: '{definition_name}' ({description})")
-                dataset_content = AstraAdmin().get_data_set(experiment_id, definition_name)
-                
-                # Handle the _empty object issue properly
-                is_valid = False
-                try:
-                    if dataset_content and hasattr(dataset_content, 'strip') and len(dataset_content.strip()) > 10:
-                        is_valid = True
-                except (AttributeError, TypeError):
-                    # This catches '_empty' object has no attribute 'strip' errors
-                    is_valid = False
-                
-                if is_valid:
-                    content_length = len(dataset_content)
-                    lines = len(dataset_content.split('\n'))
-                    log(f"  ✓ Found data for '{definition_name}': {content_length} chars, {lines} lines")
-                    
-                    # Export this dataset
-                    safe_name = definition_name.replace(' ', '_').replace('vs', 'vs')
-                    data_filename = f"{safe_name}_{results_timestamp}.csv"
-                    data_path = os.path.join(results_dir, data_filename)
-                    
-                    log(f"    Exporting to: {data_filename}")
-                    
-                    try:
-                        success = AstraAdmin().save_data_set(experiment_id, definition_name, data_path)
-                        if success and os.path.exists(data_path):
-                            data_size = os.path.getsize(data_path)
-                            log(f"    ✓ Dataset exported successfully: {data_size:,} bytes")
-                            log(f"    ✓ Dataset type: {description}")
-                            exported_datasets.append((definition_name, data_filename, description))
-                            dataset_exported = True
-                            
-                            if "masses" in definition_name.lower():
-                                log("    🔬 This file contains your molecular weight data!")
-                                log("    📊 Look for 'Molar Mass (g/mol)' section in the CSV file")
-                        else:
-                            log(f"    ✗ Export failed or file not created")
-                    except Exception as e:
-                        log(f"    ✗ Export error: {e}")
+                close_success = admin.close_experiment(experiment_id)
+                if close_success:
+                    log("✓ Experiment closed successfully!")
+                    log("✓ ASTRA workspace cleaned up")
                 else:
-                    log(f"  → '{definition_name}' - no data or empty result")
-                    
+                    log("⚠ Warning: Experiment close reported failure")
             except Exception as e:
-                if "'_empty' object" not in str(e):
-                    log(f"  → '{definition_name}' - error: {e}")
-                else:
-                    log(f"  → '{definition_name}' - empty dataset")
-        
-        if not dataset_exported:
-            log("⚠ Warning - no datasets were exported")
-            log("💡 This suggests the experiment may not have been processed properly")
-        else:
-            log("✅ Dataset export summary:")
-            for def_name, filename, desc in exported_datasets:
-                log(f"  → {filename} ({desc})")
-            log("🎯 CSV export problem SOLVED - using real ASTRA dataset definition names!")
-        
-        # Final completion summary
-        log("=== COMPLETE SUCCESS ===")
-        log("✓ Full GPC automation workflow completed successfully!")
-        log("✓ Experiment created from method template")
-        log("✓ GPC auto-inject signal received and processed")
-        log("✓ Data collection completed")
-        log("✓ Results calculated and processed")
-        log("✓ All files saved to disk as permanent proof")
-        log("")
-        log("Generated files in results folder:")
-        log(f"  → Complete experiment: {final_filename}")
-        log(f"  → Results (XML): {results_filename}")
-        if dataset_exported:
-            for def_name, filename, desc in exported_datasets:
-                log(f"  → Dataset CSV: {filename} ({desc})")
-        else:
-            log(f"  → Dataset CSV: FAILED TO EXPORT")
-        log("")
-        log("🎉 Complete GPC automation with molecular weight data export!")
-        log("📊 Check the 'masses vs volume' CSV for molecular weight values")
-        log("🎉 Your GPC automation pipeline is working perfectly!")
-        
-        # Step 12: Close Experiment (following Wyatt's pattern)
-        log("=== Step 12: Closing Experiment ===")
-        log("About to call AstraAdmin().close_experiment()...")
-        log("  → This properly closes the experiment in ASTRA")
-        log("  → Follows Wyatt's cleanup pattern")
-        log("  → Prepares for clean disposal")
-        
-        try:
-            close_success = AstraAdmin().close_experiment(experiment_id)
-            if close_success:
-                log("✓ Experiment closed successfully!")
-                log("✓ ASTRA workspace cleaned up")
-            else:
-                log("⚠ Warning: Experiment close reported failure")
-        except Exception as e:
-            log(f"⚠ Warning - experiment close error: {e}")
-        
+                log(f"⚠ Warning - experiment close error: {e}")
+            
         return True
         
     except Exception as e:
@@ -372,43 +403,64 @@ def main():
 if __name__ == "__main__":
     success = main()
     
+    # The closing report goes to stdout in one write
+    report = []
+    
     # Cleanup: Properly dispose of ASTRA connection (prevents zombie processes)
+    # main()'s last log lines are still buffered; show them before ASTRA shuts down
+    sys.stdout.flush()
     try:
         AstraAdmin().dispose()
-        print("\n🧹 Cleanup: ASTRA connection disposed properly")
-        print("✓ ASTRA will close automatically after disposal")
-        print("✓ No zombie processes will remain")
+        report += [
+            "\n🧹 Cleanup: ASTRA connection disposed properly",
+            "✓ ASTRA will close automatically after disposal",
+            "✓ No zombie processes will remain",
+        ]
     except Exception as e:
-        print(f"\n⚠ Cleanup warning: {e}")
-        print("   → You may need to manually close ASTRA")
+        report += [
+            f"\n⚠ Cleanup warning: {e}",
+            "   → You may need to manually close ASTRA",
+        ]
     
     if success:
-        print("\n🎉 SUCCESS: Complete GPC automation worked using Wyatt's approach!")
-        print("🔬 Full workflow completed: create → wait for GPC → collect → export")
+        report += [
+            "\n🎉 SUCCESS: Complete GPC automation worked using Wyatt's approach!",
+            "🔬 Full workflow completed: create → wait for GPC → collect → export",
+        ]
     else:
-        print("\n✗ FAILED: Issue with Wyatt's intended workflow")
-        print("This tells us where the real problem is")
-        
-    print("\nThis test uses ONLY Wyatt's intended methods:")
-    print("• AstraAdmin().set_automation_identity()")
-    print("• AstraAdmin().wait_for_instruments()")  
-    print("• AstraAdmin().new_experiment_from_template()")
-    print("• AstraAdmin().start_collection() - Begin data collection")
-    print("• AstraAdmin().wait_waiting_for_auto_inject() - GPC SIGNAL!")
-    print("• AstraAdmin().wait_collection_started() - Data flowing")
-    print("• AstraAdmin().wait_collection_finished() - Collection done")
-    print("• AstraAdmin().wait_experiment_run() - Processing complete")
-    print("• AstraAdmin().save_experiment() - Save data")
-    print("• AstraAdmin().save_results() - Export results")
-    print("• AstraAdmin().save_data_set() - Export chromatograms")
-    print("• AstraAdmin().close_experiment() - Clean closure")
-    print("• AstraAdmin().dispose() - ASTRA shutdown")
-    print("• No direct COM calls, no timeouts, no workarounds")
+        report += [
+            "\n✗ FAILED: Issue with Wyatt's intended workflow",
+            "This tells us where the real problem is",
+        ]
+    
+    report += [
+        "\nThis test uses ONLY Wyatt's intended methods:",
+        "• AstraAdmin().set_automation_identity()",
+        "• AstraAdmin().wait_for_instruments()",
+        "• AstraAdmin().new_experiment_from_template()",
+        "• AstraAdmin().start_collection() - Begin data collection",
+        "• AstraAdmin().wait_waiting_for_auto_inject() - GPC SIGNAL!",
+        "• AstraAdmin().wait_collection_started() - Data flowing",
+        "• AstraAdmin().wait_collection_finished() - Collection done",
+        "• AstraAdmin().wait_experiment_run() - Processing complete",
+        "• AstraAdmin().save_experiment() - Save data",
+        "• AstraAdmin().save_results() - Export results",
+        "• AstraAdmin().save_data_set() - Export chromatograms",
+        "• AstraAdmin().close_experiment() - Clean closure",
+        "• AstraAdmin().dispose() - ASTRA shutdown",
+        "• GetDataSetNames (not in the wrapper) - called through AstraAdmin().try_get()",
+        "• No timeouts, no workarounds",
+    ]
     
     if success:
-        print("\n📁 Check the saved files in results folder!")
-        print("   → C:\\Users\\Administrator.WS\\Desktop\\wyatt-api\\gpc-automation\\results\\")
-        print("   → Complete experiment with data (.aex)")
-        print("   → Results file (.xml)")
-        print("   → Dataset file (.csv) - if export succeeded")
-        print("   → Permanent proof your complete GPC pipeline works")
\ No newline at end of file
+        report += [
+            "\n📁 Check the saved files in results folder!",
+            "   → C:\\Users\\Administrator.WS\\Desktop\\wyatt-api\\gpc-automation\\results\\",
+            "   → Complete experiment with data (.aex)",
+            "   → Results file (.xml)",
+            "   → Dataset file (.csv) - if export succeeded",
+            "   → Permanent proof your complete GPC pipeline works",
+        ]
+    
+    sys.stdout.write("\n".join(report) + "\n")
+    sys.stdout.flush()
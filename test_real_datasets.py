@@ -21,112 +21,86 @@ method as documented in the ASTRA API    if success:
 """
 
 import os
+import sys
 import uuid
-import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from io import StringIO
+from pathlib import Path
+from comtypes import COMError
 from astra_admin import AstraAdmin
+from astra_xml_parse import etree, extract_peak_results
+from gpc_utils import get_file_size, log
 
-def extract_molecular_weights_from_xml(xml_content):
+# Molar mass <result> names and the peak dict field each one is stored in
+MOLAR_MASS_FIELDS = {
+    'Mn': 'mn',
+    'Mw': 'mw',
+    'Mp': 'mp',
+    'Mv': 'mv',
+    'Mz': 'mz',
+    'Mz+1': 'mz1',
+    'M(avg)': 'mavg',
+}
+
+def scan_export(path, chunk_size=1 << 16):
+    """
+    Line count of an exported CSV and whether it holds anything besides
+    whitespace, streaming through the file instead of loading it.
+    """
+    line_count = 1
+    has_content = False
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            line_count += chunk.count(b'\n')
+            has_content = has_content or not chunk.isspace()
+    return line_count, has_content
+
+def extract_molecular_weights_from_xml(source):
     """
     Extract molecular weight values from ASTRA XML results
-    Returns list of dictionaries with peak data
+    `source` is the path (or a binary file object) of the saved results.
+    Returns list of dictionaries with peak data; values are floats (None
+    if not reported) and are only formatted when displayed
+
+    Parsing is done by astra_xml_parse.extract_peak_results(); this only
+    maps its results onto the peak dict fields used below.
     """
-    peaks_data = []
-    
     try:
-        # Split into lines for easier parsing
-        lines = xml_content.split('\n')
+        peak_results = extract_peak_results(source)
+    except (etree.ParseError, OSError, ValueError) as e:
+        print(f"Error parsing XML: {e}")
+        return []
+    
+    peaks_data = []
+    for peak_number, results in peak_results.items():
+        peak_data = {
+            'peak_number': peak_number,
+            'mn': None, 'mw': None, 'mp': None, 'mv': None, 'mz': None, 'mz1': None,
+            'mavg': None, 'pdi': None, 'units': None
+        }
         
-        current_peak_data = {}
+        # Store each molar mass moment based on its name; the units are
+        # taken from the first one
+        for name, (value, units, _) in results.items():
+            field = MOLAR_MASS_FIELDS.get(name)
+            if field is not None:
+                peak_data[field] = value
+                if peak_data['units'] is None:
+                    peak_data['units'] = units
         
-        for i, line in enumerate(lines):
-            line = line.strip()
-            
-            # Look for molar mass result sections
-            if '<result type="molar mass">' in line:
-                # Next line should have the name
-                if i + 1 < len(lines):
-                    name_line = lines[i + 1].strip()
-                    name_match = re.search(r'<name>(.+?)</name>', name_line)
-                    
-                    if name_match and i + 2 < len(lines):
-                        name = name_match.group(1)
-                        scalar_line = lines[i + 2].strip()
-                        
-                        # Extract the value and units from scalar line
-                        # <scalar units="g/mol" uncertainty="9.890642754e+01" peak="1">2.157163613e+04</scalar>
-                        scalar_match = re.search(r'<scalar.*?units="([^"]*)".*?peak="(\d+)".*?>([^<]*)</scalar>', scalar_line)
-                        
-                        if scalar_match:
-                            units = scalar_match.group(1)
-                            peak_number = int(scalar_match.group(2))
-                            value_str = scalar_match.group(3).strip()
-                            
-                            # Skip n/a values
-                            if value_str != 'n/a':
-                                # Convert scientific notation to readable number
-                                try:
-                                    value = float(value_str)
-                                    
-                                    # Find or create peak data
-                                    peak_data = next((p for p in peaks_data if p['peak_number'] == peak_number), None)
-                                    if not peak_data:
-                                        peak_data = {
-                                            'peak_number': peak_number,
-                                            'mn': None, 'mw': None, 'mp': None, 'mv': None, 'mz': None, 'mz1': None,
-                                            'mavg': None, 'pdi': None, 'units': units
-                                        }
-                                        peaks_data.append(peak_data)
-                                    
-                                    # Store the value based on the name
-                                    if name == 'Mn':
-                                        peak_data['mn'] = f"{value:.0f}"
-                                    elif name == 'Mw':
-                                        peak_data['mw'] = f"{value:.0f}"
-                                    elif name == 'Mp':
-                                        peak_data['mp'] = f"{value:.0f}"
-                                    elif name == 'Mv':
-                                        peak_data['mv'] = f"{value:.0f}"
-                                    elif name == 'Mz':
-                                        peak_data['mz'] = f"{value:.0f}"
-                                    elif name == 'Mz+1':
-                                        peak_data['mz1'] = f"{value:.0f}"
-                                    elif name == 'M(avg)':
-                                        peak_data['mavg'] = f"{value:.0f}"
-                                        
-                                except ValueError:
-                                    continue
-            
-            # Look for polydispersity (PDI)
-            elif '<result type="polydispersity">' in line:
-                if i + 1 < len(lines):
-                    name_line = lines[i + 1].strip()
-                    if '<name>Mw/Mn</name>' in name_line and i + 2 < len(lines):
-                        scalar_line = lines[i + 2].strip()
-                        scalar_match = re.search(r'<scalar.*?peak="(\d+)".*?>([^<]*)</scalar>', scalar_line)
-                        
-                        if scalar_match:
-                            peak_number = int(scalar_match.group(1))
-                            value_str = scalar_match.group(2).strip()
-                            
-                            try:
-                                value = float(value_str)
-                                peak_data = next((p for p in peaks_data if p['peak_number'] == peak_number), None)
-                                if peak_data:
-                                    peak_data['pdi'] = f"{value:.3f}"
-                            except ValueError:
-                                continue
-                            
-    except Exception as e:
-        print(f"Error parsing XML: {e}")
+        # Only peaks with molar mass results are reported
+        if peak_data['units'] is None:
+            continue
+        
+        pdi = results.get('Mw/Mn')
+        if pdi is not None:
+            peak_data['pdi'] = pdi[0]
         
+        peaks_data.append(peak_data)
+    
     return peaks_data
 
-def log(message: str):
-    """Log with timestamp"""
-    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    print(f"[{timestamp}] {message}")
-
 def main():
     """
     Test accessing results using get_results() method
@@ -134,44 +108,68 @@ def main():
     log("🎯 Testing Results Access with get_results()")
     
     # Setup - Use the RECENT experiment file that was just created
-    results_dir = r"C:\Users\Administrator.WS\Desktop\wyatt-api\gpc-automation\results"
-    target_file = os.path.join(results_dir, "gpc_run_20260113_151256", "experiment_20260113_151256.aex.afe8")
+    results_dir = Path(r"C:\Users\Administrator.WS\Desktop\wyatt-api\gpc-automation\results")
+    target_file = results_dir / "gpc_run_20260113_151256" / "experiment_20260113_151256.aex.afe8"
+    
+    # One timestamp for every file this run writes; the CSV exports use it
+    # even when no XML results were returned
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     
-    log(f"📁 Using experiment: {os.path.basename(target_file)}")
+    log(f"📁 Using experiment: {target_file.name}")
     
     # Setup ASTRA connection
-    log("=== Setting up ASTRA Connection ===")
+    log("=== Setting up ASTRA Connection ===", flush=True)
     client_id = uuid.uuid4().hex
     
     admin = None
     experiment_id = None
     
     try:
-        admin = AstraAdmin()
-        admin.set_automation_identity("Results Test", "1.0.0.0", os.getpid(), client_id, 1)
-        admin.wait_for_instruments()
-        experiment_id = admin.open_experiment(target_file)
+        # Only the ASTRA setup calls are guarded here; the steps below check
+        # for the wrapper's failure values and handle their own COM and file
+        # errors
+        try:
+            admin = AstraAdmin()
+            admin.set_automation_identity("Results Test", "1.0.0.0", os.getpid(), client_id, 1)
+            admin.wait_for_instruments()
+            experiment_id = admin.open_experiment(str(target_file))
+        except (COMError, OSError) as e:
+            log(f"✗ Error setting up ASTRA: {e}")
+            return False
         log(f"✓ Experiment opened - ID: {experiment_id}")
         
         # Test get_results() method for molecular weight values
         log("=== Testing get_results() Method ===")
         log("About to call AstraAdmin().get_results()...")
-        log("  → This should return calculated peak molecular weight values as XML")
+        log("  → This should return calculated peak molecular weight values as XML", flush=True)
+        
+        # Parsing the XML doesn't touch ASTRA, so it runs in a worker thread
+        # while the datasets below are exported
+        parse_pool = ThreadPoolExecutor(max_workers=1)
+        parse_future = None
         
         try:
             results_xml = admin.get_results(experiment_id)
             
-            if results_xml and len(results_xml) > 100:
+            # A failed GetResults comes back from try_get() as an
+            # inspect._empty instance rather than a string
+            if not isinstance(results_xml, str):
+                log("✗ Error getting results: GetResults returned no XML")
+            elif len(results_xml) > 100:
                 log(f"✓ Results retrieved: {len(results_xml)} characters")
                 
                 # Save the XML results to file for analysis
-                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                results_file = os.path.join(results_dir, f"results_xml_{timestamp}.xml")
+                results_filename = f"results_xml_{timestamp}.xml"
+                results_file = results_dir / results_filename
                 
                 with open(results_file, 'w', encoding='utf-8') as f:
                     f.write(results_xml)
                 
-                log(f"✓ Results saved to: {os.path.basename(results_file)}")
+                log(f"✓ Results saved to: {results_filename}")
+                
+                # Parsed back from the file saved above, so the XML is streamed
+                # rather than re-encoded from the string in memory
+                parse_future = parse_pool.submit(extract_molecular_weights_from_xml, str(results_file))
                 
                 # Search for molecular weight values in the XML
                 log("🔍 Searching for peak molecular weight values in XML...")
@@ -186,50 +184,37 @@ def main():
                     log("  ✓ Found molecular weight units in results")
                     
                 # Look for specific molecular weight sections
-                lines = results_xml.split('\n')
-                mn_lines = [line for line in lines if 'Mn' in line and ('g/mol' in line or 'mol' in line)]
-                mw_lines = [line for line in lines if 'Mw' in line and ('g/mol' in line or 'mol' in line)]
+                # One pass over the lines without splitting the whole string;
+                # only the first 3 matches of each are kept for display
+                mn_count = mw_count = 0
+                mn_lines, mw_lines = [], []
+                for line in StringIO(results_xml):
+                    if 'mol' in line:
+                        if 'Mn' in line:
+                            mn_count += 1
+                            if mn_count <= 3:
+                                mn_lines.append(line)
+                        if 'Mw' in line:
+                            mw_count += 1
+                            if mw_count <= 3:
+                                mw_lines.append(line)
                 
                 if mn_lines:
-                    log(f"  📊 Found {len(mn_lines)} Mn entries")
-                    for line in mn_lines[:3]:  # Show first 3
+                    log(f"  📊 Found {mn_count} Mn entries")
+                    for line in mn_lines:
                         log(f"    → {line.strip()[:100]}")
                         
                 if mw_lines:
-                    log(f"  📊 Found {len(mw_lines)} Mw entries")
-                    for line in mw_lines[:3]:  # Show first 3
+                    log(f"  📊 Found {mw_count} Mw entries")
+                    for line in mw_lines:
                         log(f"    → {line.strip()[:100]}")
                 
                 log("✅ XML results contain calculated molecular weight values!")
                 
-                # EXTRACT ACTUAL MOLECULAR WEIGHT VALUES
-                log("=== Extracting Molecular Weight Values ===")
-                mw_values = extract_molecular_weights_from_xml(results_xml)
-                
-                if mw_values:
-                    log("🎯 MOLECULAR WEIGHT RESULTS:")
-                    for peak_data in mw_values:
-                        log(f"  🔬 Peak {peak_data['peak_number']}:")
-                        if peak_data['mn']:
-                            log(f"    Mn: {peak_data['mn']} {peak_data['units']}")
-                        if peak_data['mw']:
-                            log(f"    Mw: {peak_data['mw']} {peak_data['units']}")
-                        if peak_data['mp']:
-                            log(f"    Mp: {peak_data['mp']} {peak_data['units']}")
-                        if peak_data['mz']:
-                            log(f"    Mz: {peak_data['mz']} {peak_data['units']}")
-                        if peak_data['mavg']:
-                            log(f"    M(avg): {peak_data['mavg']} {peak_data['units']}")
-                        if peak_data['pdi']:
-                            log(f"    PDI (Mw/Mn): {peak_data['pdi']}")
-                        log("")
-                else:
-                    log("⚠ Could not extract molecular weight values from XML")
-                
             else:
                 log("⚠ No results or empty results returned")
                 
-        except Exception as e:
+        except (COMError, OSError) as e:
             log(f"✗ Error getting results: {e}")
         
         # ALSO test CSV dataset export for chromatogram data
@@ -245,46 +230,71 @@ def main():
         exported_datasets = []
         
         for definition_name, description in real_dataset_definitions:
+            safe_name = definition_name.replace(' ', '_')
+            csv_filename = f"chromatogram_{safe_name}_{timestamp}.csv"
+            csv_path = results_dir / csv_filename
+            
             try:
-                log(f"  → Testing dataset: '{definition_name}'")
-                dataset_content = admin.get_data_set(experiment_id, definition_name)
+                log(f"  → Testing dataset: '{definition_name}'", flush=True)
                 
-                # Handle the _empty object issue properly
-                is_valid = False
-                try:
-                    if dataset_content and hasattr(dataset_content, 'strip') and len(dataset_content.strip()) > 10:
-                        is_valid = True
-                except (AttributeError, TypeError):
-                    is_valid = False
+                # Export straight to CSV and check the saved file, so ASTRA
+                # sends each dataset once instead of for GetDataSet and again
+                # for SaveDataSet
+                success = admin.save_data_set(experiment_id, definition_name, str(csv_path))
                 
-                if is_valid:
-                    content_length = len(dataset_content)
-                    lines = len(dataset_content.split('\n'))
-                    log(f"    ✓ Found dataset: {content_length} chars, {lines} lines")
-                    
-                    # Export this dataset
-                    safe_name = definition_name.replace(' ', '_').replace('vs', 'vs')
-                    csv_filename = f"chromatogram_{safe_name}_{timestamp}.csv"
-                    csv_path = os.path.join(results_dir, csv_filename)
-                    
-                    try:
-                        success = admin.save_data_set(experiment_id, definition_name, csv_path)
-                        if success and os.path.exists(csv_path):
-                            size = os.path.getsize(csv_path)
-                            log(f"    ✓ CSV exported: {csv_filename} ({size:,} bytes)")
-                            log(f"    ✓ Content: {description}")
-                            exported_datasets.append((definition_name, csv_filename))
-                        else:
-                            log(f"    ✗ CSV export failed")
-                    except Exception as exp_error:
-                        log(f"    ✗ CSV export error: {exp_error}")
-                        
+                # Check the export on disk; a missing file means it failed
+                size = get_file_size(csv_path) if success else None
+                
+                if size is not None:
+                    lines, has_content = scan_export(csv_path) if size > 10 else (0, False)
+                    if has_content:
+                        log(f"    ✓ Found dataset: {size:,} bytes, {lines} lines")
+                        log(f"    ✓ CSV exported: {csv_filename} ({size:,} bytes)")
+                        log(f"    ✓ Content: {description}")
+                        exported_datasets.append((definition_name, csv_filename))
+                    else:
+                        log(f"    → '{definition_name}' - no data available")
+                        # Don't leave empty exports lying around in the results folder
+                        csv_path.unlink()
                 else:
-                    log(f"    → '{definition_name}' - no data available")
+                    log(f"    → '{definition_name}' - no data available (save_data_set returned {success})")
                     
-            except Exception as e:
+            except (COMError, OSError) as e:
                 log(f"    → '{definition_name}' - error: {e}")
         
+        # EXTRACT ACTUAL MOLECULAR WEIGHT VALUES
+        # Reported once the background parse started above is done
+        if parse_future is not None:
+            log("=== Extracting Molecular Weight Values ===")
+            try:
+                mw_values = parse_future.result()
+            except Exception as e:
+                # Whatever the worker's parse raised is reported here, so the
+                # run still reaches the summary and the report
+                log(f"⚠ Could not analyze results file: {e}")
+                mw_values = None
+            
+            if mw_values:
+                log("🎯 MOLECULAR WEIGHT RESULTS:")
+                for peak_data in mw_values:
+                    log(f"  🔬 Peak {peak_data['peak_number']}:")
+                    if peak_data['mn'] is not None:
+                        log(f"    Mn: {peak_data['mn']:.0f} {peak_data['units']}")
+                    if peak_data['mw'] is not None:
+                        log(f"    Mw: {peak_data['mw']:.0f} {peak_data['units']}")
+                    if peak_data['mp'] is not None:
+                        log(f"    Mp: {peak_data['mp']:.0f} {peak_data['units']}")
+                    if peak_data['mz'] is not None:
+                        log(f"    Mz: {peak_data['mz']:.0f} {peak_data['units']}")
+                    if peak_data['mavg'] is not None:
+                        log(f"    M(avg): {peak_data['mavg']:.0f} {peak_data['units']}")
+                    if peak_data['pdi'] is not None:
+                        log(f"    PDI (Mw/Mn): {peak_data['pdi']:.3f}")
+                    log("")
+            elif mw_values is not None:
+                log("⚠ Could not extract molecular weight values from XML")
+        parse_pool.shutdown()
+        
         log("=== Summary ===")
         log("📊 Data Types Available:")
         log("  ✅ XML Results - Calculated peak molecular weights (Mn, Mw)")
@@ -298,14 +308,10 @@ def main():
         log("\n💡 Complete data access:")
         log("  → Use XML Results for calculated molecular weight values")
         log("  → Use CSV datasets for chromatogram data analysis")
-            
-    except Exception as e:
-        log(f"✗ Error setting up ASTRA: {e}")
-        return False
         
     finally:
         # CRITICAL: Always close experiment and dispose properly
-        log("=== Cleanup - Closing ASTRA ===")
+        log("=== Cleanup - Closing ASTRA ===", flush=True)
         
         if experiment_id is not None and admin is not None:
             try:
@@ -329,16 +335,24 @@ def main():
 if __name__ == "__main__":
     success = main()
     
+    # The closing report goes to stdout in one write
     if success:
-        print("\n🎉 RESULTS ACCESS TEST COMPLETE!")
-        print("� Check results folder for XML results file")
-        print("📊 XML contains the actual molecular weight values")
-        print("💡 Use XML parsing to extract Mn/Mw values programmatically")
+        report = [
+            "\n🎉 RESULTS ACCESS TEST COMPLETE!",
+            "� Check results folder for XML results file",
+            "📊 XML contains the actual molecular weight values",
+            "💡 Use XML parsing to extract Mn/Mw values programmatically",
+        ]
     else:
-        print("\n❌ Test failed")
+        report = ["\n❌ Test failed"]
+    
+    report += [
+        "\nKey Discovery:",
+        "• get_results() method returns XML with molecular weight data",
+        "• This is the proper way to access calculated results",
+        "• Dataset exports are for chromatogram data, not calculated results",
+        "• XML parsing will give you the exact Mn/Mw values",
+    ]
     
-    print("\nKey Discovery:")
-    print("• get_results() method returns XML with molecular weight data")
-    print("• This is the proper way to access calculated results")
-    print("• Dataset exports are for chromatogram data, not calculated results")
-    print("• XML parsing will give you the exact Mn/Mw values")
+    sys.stdout.write("\n".join(report) + "\n")
+    sys.stdout.flush()
@@ -0,0 +1,56 @@
+"""
+ASTRA results XML parsing test
+Checks that one bad <result> is skipped without losing the rest of the file
+(no ASTRA connection needed)
+"""
+
+from io import BytesIO
+from astra_xml_parse import extract_peak_results
+
+RESULTS_TEMPLATE = """<?xml version="1.0" encoding="utf-8"?>
+<results xmlns="http://www.wyatt.com/astra/results">
+  <peaks>
+    <result type="molar mass">
+      <name>Mn</name>
+      <scalar units="g/mol" uncertainty="200" peak="1">2.0e+04</scalar>
+    </result>
+    {}
+    <result type="polydispersity">
+      <name>Mw/Mn</name>
+      <scalar uncertainty="0.02" peak="1">2.0</scalar>
+    </result>
+  </peaks>
+</results>
+"""
+
+def parse(bad_result):
+    return extract_peak_results(BytesIO(RESULTS_TEMPLATE.format(bad_result).encode("utf-8")))
+
+def assert_other_results_kept(peak_data):
+    assert peak_data[1]["Mn"] == (2.0e4, "g/mol", 1.0)
+    assert peak_data[1]["Mw/Mn"] == (2.0, "", 1.0)
+
+def test_unconvertible_uncertainty():
+    """An uncertainty or peak attribute that isn't a number skips only that result"""
+    peak_data = parse(
+        '<result type="molar mass"><name>Mw</name>'
+        '<scalar units="g/mol" uncertainty="n/a" peak="1">4.0e+04</scalar></result>'
+        '<result type="molar mass"><name>Mp</name>'
+        '<scalar units="g/mol" uncertainty="300" peak="one">3.0e+04</scalar></result>'
+    )
+    assert "Mw" not in peak_data[1] and "Mp" not in peak_data[1]
+    assert_other_results_kept(peak_data)
+
+def test_zero_value():
+    """A value of 0 is reported with 0% uncertainty instead of dividing by it"""
+    peak_data = parse(
+        '<result type="rms radius"><name>rz</name>'
+        '<scalar units="nm" uncertainty="0.5" peak="1">0.0</scalar></result>'
+    )
+    assert peak_data[1]["rz"] == (0.0, "nm", 0.0)
+    assert_other_results_kept(peak_data)
+
+if __name__ == "__main__":
+    for test in (test_unconvertible_uncertainty, test_zero_value):
+        test()
+        print(f"✓ {test.__name__}")